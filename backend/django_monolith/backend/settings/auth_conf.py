@@ -35,9 +35,17 @@ SOCIALACCOUNT_EMAIL_AUTHENTICATION = True
 SOCIALACCOUNT_EMAIL_AUTHENTICATION_AUTO_CONNECT = True
 
 # SimpleJWT settings
+# Access tokens are validated offline - signature and expiry are checked
+# locally on every request, with no introspection call. Revocation only
+# applies to refresh tokens (blacklisted on rotation), so the access token
+# lifetime bounds how long a revoked session keeps working.
 SIMPLE_JWT = {
-    "ACCESS_TOKEN_LIFETIME": timedelta(hours=1),
-    "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
+    "ACCESS_TOKEN_LIFETIME": timedelta(
+        minutes=int(os.environ.get("JWT_ACCESS_TOKEN_LIFETIME_MINUTES", "60"))
+    ),
+    "REFRESH_TOKEN_LIFETIME": timedelta(
+        days=int(os.environ.get("JWT_REFRESH_TOKEN_LIFETIME_DAYS", "7"))
+    ),
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
     "AUTH_HEADER_TYPES": ("Bearer",),
@@ -47,6 +55,10 @@ SIMPLE_JWT = {
 EMAIL_VERIFICATION_MAX_RESENDS = 5  # Maximum number of resend attempts
 EMAIL_VERIFICATION_COOLDOWN_MINUTES = 10  # Cooldown period between resends in minutes
 EMAIL_VERIFICATION_TOKEN_EXPIRY_DAYS = 1  # Email verification tokens expire after 1 day
+# Resend requests (incl. rejected) per window, counted in the cache: global
+# only when REDIS_URL is set, per process otherwise (see cache_conf)
+EMAIL_VERIFICATION_MAX_ATTEMPTS = 10
+EMAIL_VERIFICATION_ATTEMPTS_WINDOW_MINUTES = 60  # Window for counting resend requests
 
 # Password Reset Configuration
 PASSWORD_RESET_MAX_REQUESTS = 5  # Maximum password reset requests per cooldown period
@@ -0,0 +1,21 @@
+import os
+
+# Redis is used when configured; otherwise each process keeps its own in-memory
+# cache. Cache-backed limits such as EMAIL_VERIFICATION_MAX_ATTEMPTS are only
+# shared across workers when REDIS_URL is set; with LocMemCache each process
+# counts separately.
+REDIS_URL = os.environ.get("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
@@ -58,12 +58,24 @@ class EmailLabsClient:
 
 
 def adapt_django_message_to_emaillabs(email_message: EmailMessage) -> Iterable[dict]:
+    content = {"html": email_message.body}
+    html_alternative = get_html_alternative(email_message)
+    if html_alternative is not None:
+        content = {"html": html_alternative, "text": email_message.body}
     return (
         {
             "from": email_message.from_email,
             "subject": email_message.subject,
             f"to[{to}]": "",
-            "html": email_message.body,
+            **content,
         }
         for to in email_message.to or []
     )
+
+
+def get_html_alternative(email_message: EmailMessage) -> str | None:
+    """Return the text/html alternative of a multipart message, if any."""
+    for content, mimetype in getattr(email_message, "alternatives", []):
+        if mimetype == "text/html":
+            return content
+    return None
@@ -107,8 +107,14 @@ def mock_google_oauth(mocker):
         "family_name": "User",
     }
 
-    mock_requests = mocker.patch("requests.post", return_value=mock_response)
-    mock_get = mocker.patch("requests.get", return_value=mock_userinfo_response)
+    mock_requests = mocker.patch(
+        "user_auth.views.google_auth.callback._google_session.post",
+        return_value=mock_response,
+    )
+    mock_get = mocker.patch(
+        "user_auth.views.google_auth.callback._google_session.get",
+        return_value=mock_userinfo_response,
+    )
 
     return {"post": mock_requests, "get": mock_get}
 
@@ -132,6 +138,16 @@ def set_test_settings(settings, monkeypatch):
     return settings
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test with an empty cache (rate-limit counters live there)."""
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture
 def site_settings():
     """Create or get site settings singleton."""
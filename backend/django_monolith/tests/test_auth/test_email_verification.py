@@ -65,6 +65,28 @@ class TestVerifyEmailView:
         unverified_user.refresh_from_db()
         assert unverified_user.is_active is True
 
+    def test_verify_email_while_row_locked_skips_token_check(
+        self, api_client, unverified_user, verify_url, mocker
+    ):
+        """Test that a concurrent verification of a locked user returns early."""
+        # Arrange - Simulate another request holding the row lock
+        token = default_token_generator.make_token(unverified_user)
+        uid = urlsafe_base64_encode(force_bytes(unverified_user.pk))
+        mocker.patch.object(
+            User.objects, "select_for_update", return_value=User.objects.none()
+        )
+        mock_check_token = mocker.patch(
+            "user_auth.views.email_password_auth.verify_email.default_token_generator.check_token"
+        )
+
+        # Act
+        response = api_client.post(verify_url, {"uid": uid, "token": token})
+
+        # Assert
+        assert response.status_code == status.HTTP_200_OK
+        assert "already verified" in response.data["detail"].lower()
+        mock_check_token.assert_not_called()
+
     def test_verify_email_already_verified_user(
         self, api_client, verified_user, verify_url
     ):
@@ -226,9 +248,7 @@ class TestVerifyEmailView:
         """Test complete flow: register → receive token → verify → login."""
         # Arrange
         settings.ACCOUNT_EMAIL_VERIFICATION = "mandatory"
-        mock_send_mail = mocker.patch(
-            "user_auth.views.email_password_auth.register.send_mail", return_value=1
-        )
+        mock_send_mail = mocker.patch("user_auth.email.send_mail", return_value=1)
 
         registration_data = {
             "email": "newuser@example.com",
@@ -154,9 +154,7 @@ class TestEmailVerificationMandatoryMode:
         """
         # Arrange
         settings.ACCOUNT_EMAIL_VERIFICATION = "mandatory"
-        mock_send_mail = mocker.patch(
-            "user_auth.views.email_password_auth.register.send_mail", return_value=1
-        )
+        mock_send_mail = mocker.patch("user_auth.email.send_mail", return_value=1)
 
         # Act 1: Register user
         response = api_client.post(registration_url, valid_registration_data)
@@ -256,13 +254,7 @@ class TestEmailVerificationMandatoryMode:
         """
         # Arrange
         settings.ACCOUNT_EMAIL_VERIFICATION = "mandatory"
-        mocker.patch(
-            "user_auth.views.email_password_auth.register.send_mail", return_value=1
-        )
-        mocker.patch(
-            "user_auth.views.email_password_auth.resend_verification.send_mail",
-            return_value=1,
-        )
+        mocker.patch("user_auth.email.send_mail", return_value=1)
 
         # Act 1: Register user
         api_client.post(registration_url, valid_registration_data)
@@ -352,13 +344,7 @@ class TestEmailVerificationMandatoryMode:
         """
         # Arrange
         settings.ACCOUNT_EMAIL_VERIFICATION = "mandatory"
-        mocker.patch(
-            "user_auth.views.email_password_auth.register.send_mail", return_value=1
-        )
-        mocker.patch(
-            "user_auth.views.email_password_auth.resend_verification.send_mail",
-            return_value=1,
-        )
+        mocker.patch("user_auth.email.send_mail", return_value=1)
 
         # Act 1: Register user
         api_client.post(registration_url, valid_registration_data)
@@ -1,11 +1,23 @@
 """Tests for Google OAuth authentication."""
 
-import pytest
+import base64
 import json
-from django.core.signing import TimestampSigner
+
+import pytest
+import requests
+from freezegun import freeze_time
+from urllib.parse import parse_qs, urlparse
 from rest_framework import status
 from django.contrib.auth import get_user_model
-from user_auth.models import SocialAccount
+from user_auth.conf import google_oauth_config
+from user_auth.models import SocialAccount, UserProfile
+from user_auth.views.google_auth.callback import (
+    create_google_user,
+    create_oauth_context_state,
+    create_register_redirect_token,
+    decode_oauth_context_state,
+    verify_register_redirect_token,
+)
 
 User = get_user_model()
 
@@ -14,12 +26,9 @@ pytestmark = pytest.mark.django_db
 
 def create_oauth_state(from_register=True, terms_accepted=True):
     """Helper to create a signed OAuth state parameter."""
-    signer = TimestampSigner()
-    state_data = {
-        "from_register": from_register,
-        "terms_accepted": terms_accepted,
-    }
-    return signer.sign(json.dumps(state_data))
+    return create_oauth_context_state(
+        {"from_register": from_register, "terms_accepted": terms_accepted}
+    )
 
 
 class TestGoogleOAuth:
@@ -45,6 +54,54 @@ class TestGoogleOAuth:
         assert "auth_url" in response.data
         assert "https://accounts.google.com/o/oauth2" in response.data["auth_url"]
 
+    def test_google_auth_url_follows_backend_url_setting(
+        self, api_client, auth_url_endpoint, settings
+    ):
+        """Test that the cached redirect URI is refreshed when settings change."""
+        # Arrange
+        api_client.get(auth_url_endpoint)
+        settings.BACKEND_URL = "https://api.example.com"
+
+        # Act
+        response = api_client.get(auth_url_endpoint)
+
+        # Assert
+        query = parse_qs(urlparse(response.data["auth_url"]).query)
+        assert query["redirect_uri"] == [
+            "https://api.example.com/api/v1/auth/social/google/"
+        ]
+
+    @freeze_time("2026-01-01 12:00:00")
+    def test_google_auth_url_reuses_register_state_token(
+        self, api_client, auth_url_endpoint
+    ):
+        """Test that register-page requests share one decodable signed state."""
+        # Arrange
+        params = {"from_register": "true", "terms_accepted": "true"}
+
+        # Act
+        first = api_client.get(auth_url_endpoint, params)
+        second = api_client.get(auth_url_endpoint, params)
+
+        # Assert
+        state = parse_qs(urlparse(first.data["auth_url"]).query)["state"][0]
+        assert first.data["auth_url"] == second.data["auth_url"]
+        assert decode_oauth_context_state(state) == {
+            "from_register": True,
+            "terms_accepted": True,
+        }
+
+    def test_register_redirect_token_is_not_accepted_as_oauth_state(self):
+        """Test that a register redirect token cannot stand in for OAuth state."""
+        # Arrange
+        token = create_register_redirect_token({"from_register": True})
+
+        # Act
+        context = decode_oauth_context_state(token)
+
+        # Assert
+        assert context == {}
+
     def test_google_callback_with_valid_code_creates_user(
         self, api_client, callback_endpoint, mock_google_oauth
     ):
@@ -76,6 +133,97 @@ class TestGoogleOAuth:
         social_account = SocialAccount.objects.get(user=user, provider="google")
         assert social_account.uid == "123456789"
 
+    def test_google_callback_reads_profile_from_id_token(
+        self, api_client, callback_endpoint, mock_google_oauth
+    ):
+        """Test that the ID token claims are used instead of calling userinfo."""
+        # Arrange
+        claims = {
+            "iss": "https://accounts.google.com",
+            "aud": google_oauth_config().client_id,
+            "exp": 4102444800,  # 2100-01-01
+            "sub": "987654321",
+            "email": "idtoken@gmail.com",
+            "email_verified": True,
+            "given_name": "Id",
+            "family_name": "Token",
+        }
+        payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).rstrip(b"=")
+        mock_google_oauth["post"].return_value.json.return_value = {
+            "access_token": "fake-google-token",
+            "id_token": f"header.{payload.decode()}.signature",
+        }
+        callback_data = {
+            "code": "valid-google-code",
+            "state": create_oauth_state(from_register=True, terms_accepted=True),
+        }
+
+        # Act
+        response = api_client.post(callback_endpoint, callback_data)
+
+        # Assert
+        assert response.status_code == status.HTTP_200_OK
+        mock_google_oauth["get"].assert_not_called()
+        user = User.objects.get(email="idtoken@gmail.com")
+        assert user.first_name == "Id"
+        assert SocialAccount.objects.get(user=user).uid == "987654321"
+
+    @pytest.mark.parametrize(
+        "claims",
+        [
+            ["aud", "sub"],
+            "claims",
+            42,
+            None,
+            {"iss": "https://evil.example.com"},
+            {"aud": "another-client-id"},
+            {"exp": 946684800},  # 2000-01-01
+            {"exp": "4102444800"},
+        ],
+        ids=[
+            "list",
+            "string",
+            "number",
+            "null",
+            "wrong-issuer",
+            "wrong-audience",
+            "expired",
+            "non-numeric-expiry",
+        ],
+    )
+    def test_google_callback_falls_back_to_userinfo_for_unusable_id_token(
+        self, api_client, callback_endpoint, mock_google_oauth, claims
+    ):
+        """Test that an ID token failing any check is ignored for userinfo."""
+        # Arrange
+        if isinstance(claims, dict):
+            claims = {
+                "iss": "accounts.google.com",
+                "aud": google_oauth_config().client_id,
+                "exp": 4102444800,
+                "sub": "987654321",
+                "email": "idtoken@gmail.com",
+                **claims,
+            }
+        payload = base64.urlsafe_b64encode(json.dumps(claims).encode()).rstrip(b"=")
+        mock_google_oauth["post"].return_value.json.return_value = {
+            "access_token": "fake-google-token",
+            "id_token": f"header.{payload.decode()}.signature",
+        }
+        callback_data = {
+            "code": "valid-google-code",
+            "state": create_oauth_state(from_register=True, terms_accepted=True),
+        }
+
+        # Act
+        response = api_client.post(callback_endpoint, callback_data)
+
+        # Assert
+        assert response.status_code == status.HTTP_200_OK
+        mock_google_oauth["get"].assert_called_once()
+        assert User.objects.filter(email="testuser@gmail.com").exists()
+        assert not User.objects.filter(email="idtoken@gmail.com").exists()
+
     def test_google_callback_with_existing_email_links_account(
         self, api_client, callback_endpoint, mock_google_oauth
     ):
@@ -110,6 +258,28 @@ class TestGoogleOAuth:
         # Verify no duplicate user was created
         assert User.objects.filter(email="testuser@gmail.com").count() == 1
 
+    def test_google_callback_linking_verified_user_reads_cached_relations(
+        self,
+        api_client,
+        callback_endpoint,
+        mock_google_oauth,
+        verified_user,
+        django_assert_num_queries,
+    ):
+        """Test that linking reuses the joined profile and token instead of re-querying."""
+        # Arrange
+        verified_user.email = "testuser@gmail.com"
+        verified_user.save()
+        UserProfile.objects.create(user=verified_user, terms_accepted=True)
+
+        # Act - two user lookups, social account get_or_create (SELECT,
+        # SAVEPOINT, INSERT, RELEASE) and the outstanding token INSERT
+        with django_assert_num_queries(7):
+            response = api_client.post(callback_endpoint, {"code": "valid-google-code"})
+
+        # Assert
+        assert response.status_code == status.HTTP_200_OK
+
     def test_google_callback_with_existing_social_account_logs_in(
         self, api_client, callback_endpoint, mock_google_oauth
     ):
@@ -143,6 +313,49 @@ class TestGoogleOAuth:
         # Verify no duplicate accounts were created
         assert SocialAccount.objects.filter(user=user, provider="google").count() == 1
 
+    def test_google_callback_existing_social_account_loads_user_in_one_query(
+        self,
+        api_client,
+        callback_endpoint,
+        mock_google_oauth,
+        verified_user,
+        django_assert_num_queries,
+    ):
+        """Test that a returning Google user is loaded with a single joined query."""
+        # Arrange
+        SocialAccount.objects.create(
+            user=verified_user,
+            provider="google",
+            uid="123456789",
+            extra_data={"email": verified_user.email},
+        )
+
+        # Act - one SELECT for the user, one INSERT for the outstanding token
+        with django_assert_num_queries(2):
+            response = api_client.post(callback_endpoint, {"code": "valid-google-code"})
+
+        # Assert
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_create_google_user_links_user_created_concurrently(self, unverified_user):
+        """Test that losing the user-creation race links the existing user."""
+        # Arrange - another callback already created the user for this email
+        unverified_user.username = unverified_user.email
+        unverified_user.save()
+
+        # Act
+        user = create_google_user(
+            unverified_user.email, "Test", "User", "123456789", {"id": "123456789"}
+        )
+
+        # Assert
+        assert user.pk == unverified_user.pk
+        assert user.is_active is True
+        assert User.objects.filter(email=unverified_user.email).count() == 1
+        assert (
+            SocialAccount.objects.get(provider="google", uid="123456789").user == user
+        )
+
     def test_google_callback_with_invalid_code_returns_400(
         self, api_client, callback_endpoint, mocker
     ):
@@ -152,7 +365,10 @@ class TestGoogleOAuth:
         mock_response = mocker.MagicMock()
         mock_response.status_code = 400
         mock_response.json.return_value = {"error": "invalid_grant"}
-        mock_post = mocker.patch("requests.post", return_value=mock_response)
+        mock_post = mocker.patch(
+            "user_auth.views.google_auth.callback._google_session.post",
+            return_value=mock_response,
+        )
 
         callback_data = {"code": "invalid-code"}
 
@@ -163,6 +379,23 @@ class TestGoogleOAuth:
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         mock_post.assert_called_once()
 
+    def test_google_callback_when_google_unreachable_returns_400(
+        self, api_client, callback_endpoint, mocker
+    ):
+        """Test that a network error talking to Google is reported as a 400."""
+        # Arrange
+        mocker.patch(
+            "user_auth.views.google_auth.callback._google_session.post",
+            side_effect=requests.ConnectionError("connection reset"),
+        )
+
+        # Act
+        response = api_client.post(callback_endpoint, {"code": "valid-code"})
+
+        # Assert
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["detail"] == "Failed to exchange authorization code."
+
     def test_google_callback_without_code_returns_400(
         self, api_client, callback_endpoint
     ):
@@ -192,8 +425,14 @@ class TestGoogleOAuth:
             "family_name": "User",
         }
 
-        mock_post = mocker.patch("requests.post", return_value=mock_response)
-        mock_get = mocker.patch("requests.get", return_value=mock_userinfo)
+        mock_post = mocker.patch(
+            "user_auth.views.google_auth.callback._google_session.post",
+            return_value=mock_response,
+        )
+        mock_get = mocker.patch(
+            "user_auth.views.google_auth.callback._google_session.get",
+            return_value=mock_userinfo,
+        )
 
         callback_data = {"code": "valid-code"}
 
@@ -206,6 +445,227 @@ class TestGoogleOAuth:
         mock_get.assert_called_once()
 
 
+class TestGoogleOAuthRedirectCallback:
+    """Tests for the GET callback that Google redirects the browser to."""
+
+    @pytest.fixture
+    def callback_endpoint(self):
+        return "/api/v1/auth/social/google/"
+
+    def test_google_error_is_forwarded_to_frontend(self, api_client, callback_endpoint):
+        """Test that an error from Google is passed on in the redirect."""
+        # Act
+        response = api_client.get(callback_endpoint, {"error": "access denied"})
+
+        # Assert
+        assert response.status_code == status.HTTP_302_FOUND
+        assert response.url == "http://localhost:3000/?error=access%20denied"
+
+    def test_missing_code_redirects_with_error(self, api_client, callback_endpoint):
+        """Test that a callback without a code redirects with no_code."""
+        # Act
+        response = api_client.get(callback_endpoint)
+
+        # Assert
+        assert response.url == "http://localhost:3000/?error=no_code"
+
+    def test_valid_code_redirects_with_tokens(
+        self, api_client, callback_endpoint, mock_google_oauth
+    ):
+        """Test that a registered-page login redirects to the frontend with JWTs."""
+        # Arrange
+        params = {
+            "code": "valid-google-code",
+            "state": create_oauth_state(from_register=True, terms_accepted=True),
+        }
+
+        # Act
+        response = api_client.get(callback_endpoint, params)
+
+        # Assert
+        assert response.status_code == status.HTTP_302_FOUND
+        redirect_url = urlparse(response.url)
+        assert redirect_url.path == "/auth/google/callback"
+        assert {"access", "refresh"} <= parse_qs(redirect_url.query).keys()
+
+    def test_login_page_user_is_sent_to_register(
+        self, api_client, callback_endpoint, mock_google_oauth
+    ):
+        """Test that a new user from the login page is sent to accept terms."""
+        # Act
+        response = api_client.get(callback_endpoint, {"code": "valid-google-code"})
+
+        # Assert
+        redirect_url = urlparse(response.url)
+        assert redirect_url.path == "/auth/register"
+        query = parse_qs(redirect_url.query)
+        assert query["oauth_pending"] == ["google"]
+        assert not User.objects.filter(email="testuser@gmail.com").exists()
+
+
+class TestCompleteOAuthRegistration:
+    """Tests for completing Google registration after terms acceptance."""
+
+    @pytest.fixture
+    def complete_endpoint(self):
+        return "/api/v1/auth/social/google/complete/"
+
+    @pytest.fixture
+    def google_user_data(self):
+        return {
+            "email": "testuser@gmail.com",
+            "first_name": "Test",
+            "last_name": "User",
+            "google_id": "123456789",
+            "extra_data": {"id": "123456789", "email": "testuser@gmail.com"},
+        }
+
+    def test_complete_creates_verified_user(
+        self, api_client, complete_endpoint, google_user_data
+    ):
+        """Test that completing registration creates a linked, verified user."""
+        # Arrange
+        state_token = create_register_redirect_token(google_user_data)
+
+        # Act
+        response = api_client.post(
+            complete_endpoint,
+            {"state_token": state_token, "terms_accepted": True},
+            format="json",
+        )
+
+        # Assert
+        assert response.status_code == status.HTTP_200_OK
+        assert "access" in response.data
+        user = User.objects.get(email="testuser@gmail.com")
+        assert user.verification_token.verified_at is not None
+        assert user.profile.terms_accepted is True
+        assert (
+            SocialAccount.objects.get(provider="google", uid="123456789").user == user
+        )
+
+    def test_complete_links_existing_user_and_accepts_terms(
+        self, api_client, complete_endpoint, google_user_data, verified_user
+    ):
+        """Test that an existing user is linked and has terms marked accepted."""
+        # Arrange
+        google_user_data["email"] = verified_user.email
+        UserProfile.objects.create(user=verified_user, terms_accepted=False)
+        state_token = create_register_redirect_token(google_user_data)
+
+        # Act
+        response = api_client.post(
+            complete_endpoint,
+            {"state_token": state_token, "terms_accepted": True},
+            format="json",
+        )
+
+        # Assert
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["user"]["terms_accepted"] is True
+        verified_user.profile.refresh_from_db()
+        assert verified_user.profile.terms_accepted_at is not None
+        assert SocialAccount.objects.filter(user=verified_user).count() == 1
+
+    def test_complete_existing_user_does_not_reload_profile(
+        self,
+        api_client,
+        complete_endpoint,
+        google_user_data,
+        verified_user,
+        django_assert_num_queries,
+    ):
+        """Test that the response reuses the accepted terms instead of a profile SELECT."""
+        # Arrange
+        google_user_data["email"] = verified_user.email
+        UserProfile.objects.create(user=verified_user, terms_accepted=False)
+        state_token = create_register_redirect_token(google_user_data)
+
+        # Act - user SELECT, account get_or_create (SELECT, SAVEPOINT, INSERT,
+        # RELEASE), profile UPDATE, token INSERT
+        with django_assert_num_queries(7):
+            response = api_client.post(
+                complete_endpoint,
+                {"state_token": state_token, "terms_accepted": True},
+                format="json",
+            )
+
+        # Assert
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["user"]["terms_accepted"] is True
+
+    def test_complete_reuses_account_linked_concurrently(
+        self, api_client, complete_endpoint, google_user_data, verified_user
+    ):
+        """Test that an account linked by a concurrent request is not duplicated."""
+        # Arrange
+        google_user_data["email"] = verified_user.email
+        SocialAccount.objects.create(
+            user=verified_user, provider="google", uid=google_user_data["google_id"]
+        )
+        state_token = create_register_redirect_token(google_user_data)
+
+        # Act
+        response = api_client.post(
+            complete_endpoint,
+            {"state_token": state_token, "terms_accepted": True},
+            format="json",
+        )
+
+        # Assert
+        assert response.status_code == status.HTTP_200_OK
+        assert SocialAccount.objects.filter(uid="123456789").count() == 1
+
+    def test_complete_creates_missing_profile_for_existing_user(
+        self, api_client, complete_endpoint, google_user_data, verified_user
+    ):
+        """Test that an existing user without a profile gets one with terms accepted."""
+        # Arrange
+        google_user_data["email"] = verified_user.email
+        state_token = create_register_redirect_token(google_user_data)
+
+        # Act
+        response = api_client.post(
+            complete_endpoint,
+            {"state_token": state_token, "terms_accepted": True},
+            format="json",
+        )
+
+        # Assert
+        assert response.status_code == status.HTTP_200_OK
+        profile = UserProfile.objects.get(user=verified_user)
+        assert profile.terms_accepted is True
+        assert profile.terms_accepted_at is not None
+
+    def test_register_redirect_token_is_compressed(self, google_user_data):
+        """Test that the profile payload is compressed to keep redirect URLs short."""
+        # Arrange
+        google_user_data["extra_data"]["picture"] = (
+            "https://lh3.googleusercontent.com/" + "a" * 200
+        )
+
+        # Act
+        token = create_register_redirect_token(google_user_data)
+
+        # Assert
+        assert token.startswith(".")
+        assert verify_register_redirect_token(token) == google_user_data
+
+    def test_complete_with_invalid_token_returns_400(
+        self, api_client, complete_endpoint
+    ):
+        """Test that a tampered state token is rejected."""
+        # Act
+        response = api_client.post(
+            complete_endpoint,
+            {"state_token": "tampered", "terms_accepted": True},
+            format="json",
+        )
+
+        # Assert
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
 class TestGoogleOAuthPermissions:
     """Test that OAuth endpoints have correct permissions."""
 
@@ -113,7 +113,7 @@ class TestPasswordResetIntegration:
         """
         # Arrange
         mock_send_mail = mocker.patch(
-            "user_auth.views.email_password_auth.password_reset_request.send_mail",
+            "user_auth.email.send_mail",
             return_value=1,
         )
 
@@ -47,7 +47,7 @@ class TestPasswordResetRequestView:
         """Test password reset for unverified user sends verification email instead."""
         # Arrange
         mock_send_mail = mocker.patch(
-            "user_auth.views.email_password_auth.password_reset_request.send_mail",
+            "user_auth.email.send_mail",
             return_value=1,
         )
 
@@ -59,6 +59,12 @@ class TestPasswordResetRequestView:
         assert "not verified" in response.data["detail"].lower()
         assert response.data["action_required"] == "verify_email"
         mock_send_mail.assert_called_once()
+        message = mock_send_mail.call_args[0][1]
+        html_message = mock_send_mail.call_args[1]["html_message"]
+        assert "After verification, you can reset your password." in message
+        assert "reset your password" in html_message
+        assert "safely ignore this email" not in message
+        assert "safely ignore this email" not in html_message
 
         # Verify no password reset token was created
         assert not PasswordResetToken.objects.filter(user=unverified_user).exists()
@@ -67,9 +67,7 @@ class TestRegistration:
         # Arrange
         settings.ACCOUNT_EMAIL_VERIFICATION = "mandatory"
         # Mock send_mail to return success
-        mock_send_mail = mocker.patch(
-            "user_auth.views.email_password_auth.register.send_mail", return_value=1
-        )
+        mock_send_mail = mocker.patch("user_auth.email.send_mail", return_value=1)
 
         # Act
         response = api_client.post(registration_url, valid_registration_data)
@@ -80,15 +78,33 @@ class TestRegistration:
         assert "Verification email sent" in response.data["detail"]
         mock_send_mail.assert_called_once()
 
+    def test_registration_verification_email_contains_link_and_expiry(
+        self, api_client, registration_url, valid_registration_data, settings, mocker
+    ):
+        """Test that the verification email greets the user and links to verify."""
+        # Arrange
+        settings.ACCOUNT_EMAIL_VERIFICATION = "mandatory"
+        mock_send_mail = mocker.patch("user_auth.email.send_mail", return_value=1)
+
+        # Act
+        api_client.post(registration_url, valid_registration_data)
+
+        # Assert
+        message = mock_send_mail.call_args.args[1]
+        assert message.startswith("Hello New,")
+        assert f"{settings.FRONTEND_URL}/auth/verify-email?uid=" in message
+        assert "This link will expire in 1 day." in message
+        html_message = mock_send_mail.call_args.kwargs["html_message"]
+        assert "Thank you for registering with Diagramik!" in html_message
+        assert '<a href="http://localhost:3000/auth/verify-email?uid=' in html_message
+
     def test_registration_creates_inactive_user_when_verification_mandatory(
         self, api_client, registration_url, valid_registration_data, settings, mocker
     ):
         """Test that user is created with is_active=False when verification is mandatory."""
         # Arrange
         settings.ACCOUNT_EMAIL_VERIFICATION = "mandatory"
-        mocker.patch(
-            "user_auth.views.email_password_auth.register.send_mail", return_value=1
-        )
+        mocker.patch("user_auth.email.send_mail", return_value=1)
 
         # Act
         response = api_client.post(registration_url, valid_registration_data)
@@ -104,9 +120,7 @@ class TestRegistration:
         """Test that registration creates EmailVerificationToken record."""
         # Arrange
         settings.ACCOUNT_EMAIL_VERIFICATION = "mandatory"
-        mocker.patch(
-            "user_auth.views.email_password_auth.register.send_mail", return_value=1
-        )
+        mocker.patch("user_auth.email.send_mail", return_value=1)
 
         # Act
         response = api_client.post(registration_url, valid_registration_data)
@@ -125,9 +139,7 @@ class TestRegistration:
         # Arrange
         settings.ACCOUNT_EMAIL_VERIFICATION = "mandatory"
         # Mock send_mail to return failure
-        mocker.patch(
-            "user_auth.views.email_password_auth.register.send_mail", return_value=0
-        )
+        mocker.patch("user_auth.email.send_mail", return_value=0)
 
         # Act
         response = api_client.post(registration_url, valid_registration_data)
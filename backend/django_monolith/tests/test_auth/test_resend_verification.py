@@ -32,7 +32,7 @@ class TestResendVerificationEmailView:
 
         # Mock send_mail at the correct path
         mock_send_mail = mocker.patch(
-            "user_auth.views.email_password_auth.resend_verification.send_mail",
+            "user_auth.email.send_mail",
             return_value=1,
         )
 
@@ -139,7 +139,7 @@ class TestResendVerificationEmailView:
 
         # Mock send_mail at the correct path
         mock_send_mail = mocker.patch(
-            "user_auth.views.email_password_auth.resend_verification.send_mail",
+            "user_auth.email.send_mail",
             return_value=1,
         )
 
@@ -168,6 +168,27 @@ class TestResendVerificationEmailView:
         assert "Maximum resend attempts" in response.data["detail"]
         assert "5" in response.data["detail"]
 
+    def test_resend_rejects_repeated_attempts_before_db(
+        self, api_client, unverified_user, resend_url, settings, mocker
+    ):
+        """Test that attempts over the limit are rejected from the cache alone."""
+        # Arrange - Each attempt is rejected by the DB cooldown
+        settings.EMAIL_VERIFICATION_MAX_ATTEMPTS = 2
+        unverified_user.verification_token.last_sent_at = timezone.now()
+        unverified_user.verification_token.save()
+        for _ in range(2):
+            response = api_client.post(resend_url, {"email": unverified_user.email})
+            assert "wait" in response.data["detail"].lower()
+        mock_get = mocker.patch.object(User.objects, "get")
+
+        # Act
+        response = api_client.post(resend_url, {"email": unverified_user.email})
+
+        # Assert
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert "Too many" in response.data["detail"]
+        mock_get.assert_not_called()
+
     def test_resend_returns_remaining_cooldown_time(
         self, api_client, unverified_user, resend_url
     ):
@@ -197,7 +218,7 @@ class TestResendVerificationEmailView:
 
         # Mock send_mail at the correct path
         mock_send_mail = mocker.patch(
-            "user_auth.views.email_password_auth.resend_verification.send_mail",
+            "user_auth.email.send_mail",
             return_value=1,
         )
 
@@ -221,7 +242,7 @@ class TestResendVerificationEmailView:
 
         # Mock email send to fail
         mocker.patch(
-            "user_auth.views.email_password_auth.resend_verification.send_mail",
+            "user_auth.email.send_mail",
             return_value=0,  # Email send failed
         )
 
@@ -182,6 +182,51 @@ class TestSetNewPasswordView:
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         # Django password validators will reject this
 
+    def test_set_password_short_password_skips_validator_chain(
+        self, api_client, user, set_password_url, mocker
+    ):
+        """Test that short passwords are rejected before the full validators run."""
+        # Arrange
+        token = default_token_generator.make_token(user)
+        uid = urlsafe_base64_encode(force_bytes(user.pk))
+        mock_validate = mocker.patch(
+            "user_auth.views.email_password_auth.set_new_password.validate_password"
+        )
+
+        # Act
+        response = api_client.post(
+            set_password_url, {"uid": uid, "token": token, "new_password": "abc"}
+        )
+
+        # Assert
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["detail"] == ["Password must be at least 8 characters."]
+        mock_validate.assert_not_called()
+
+    def test_set_password_short_password_uses_configured_min_length(
+        self, api_client, user, set_password_url, settings
+    ):
+        """Test that the quick length check follows AUTH_PASSWORD_VALIDATORS."""
+        # Arrange
+        settings.AUTH_PASSWORD_VALIDATORS = [
+            {
+                "NAME": "django.contrib.auth.password_validation.MinimumLengthValidator",
+                "OPTIONS": {"min_length": 12},
+            },
+        ]
+        token = default_token_generator.make_token(user)
+        uid = urlsafe_base64_encode(force_bytes(user.pk))
+
+        # Act
+        response = api_client.post(
+            set_password_url,
+            {"uid": uid, "token": token, "new_password": "Secure#Pas1"},
+        )
+
+        # Assert
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["detail"] == ["Password must be at least 12 characters."]
+
     def test_set_password_marks_token_as_used(self, api_client, user, set_password_url):
         """Test set password marks PasswordResetToken as used."""
         # Arrange
@@ -0,0 +1,45 @@
+"""Tests for the current user endpoint."""
+
+import pytest
+from rest_framework import status
+
+pytestmark = pytest.mark.django_db
+
+
+class TestUserView:
+    """Tests for UserView."""
+
+    @pytest.fixture
+    def user_url(self):
+        return "/api/v1/auth/user/"
+
+    def test_get_returns_current_user(self, authenticated_client, user, user_url):
+        """Test that GET returns the authenticated user's data."""
+        # Act
+        response = authenticated_client.get(user_url)
+
+        # Assert
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["email"] == user.email
+
+    def test_patch_updates_only_given_fields(
+        self, authenticated_client, user, user_url
+    ):
+        """Test that PATCH updates the provided name and keeps the other."""
+        # Act
+        response = authenticated_client.patch(user_url, {"first_name": "Renamed"})
+
+        # Assert
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["first_name"] == "Renamed"
+        user.refresh_from_db()
+        assert user.first_name == "Renamed"
+        assert user.last_name == "User"
+
+    def test_patch_requires_authentication(self, api_client, user_url):
+        """Test that PATCH without authentication is rejected."""
+        # Act
+        response = api_client.patch(user_url, {"first_name": "Renamed"})
+
+        # Assert
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
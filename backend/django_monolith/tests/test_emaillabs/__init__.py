@@ -0,0 +1 @@
+# EmailLabs email backend tests
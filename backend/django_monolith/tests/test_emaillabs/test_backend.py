@@ -0,0 +1,85 @@
+"""Unit tests for the EmailLabs email backend."""
+
+import pytest
+from django.core.mail import EmailMessage, EmailMultiAlternatives
+
+from django_emaillabs_sendmail.backend import EmailLabsEmailBackend
+
+
+class TestEmailLabsEmailBackend:
+    """Tests for EmailLabsEmailBackend request payloads."""
+
+    @pytest.fixture
+    def backend(self, settings):
+        settings.EMAILLABS_API_APP_KEY = "app-key"
+        settings.EMAILLABS_API_SECRET_KEY = "secret-key"
+        return EmailLabsEmailBackend()
+
+    @pytest.fixture
+    def mock_post(self, mocker):
+        mock_post = mocker.patch("django_emaillabs_sendmail.backend.rq.post")
+        mock_post.return_value.ok = True
+        return mock_post
+
+    def test_html_alternative_is_sent_as_html_with_text_body(
+        self, backend, mock_post, settings
+    ):
+        """Test that a multipart message sends its HTML part and plain body."""
+        # Arrange
+        message = EmailMultiAlternatives(
+            "Verify your account",
+            "Plain body",
+            "noreply@example.com",
+            ["user@example.com"],
+        )
+        message.attach_alternative("<p>HTML body</p>", "text/html")
+
+        # Act
+        sent = backend.send_messages([message])
+
+        # Assert
+        assert sent == 1
+        mock_post.assert_called_once()
+        assert mock_post.call_args.args == (settings.EMAILLABS_API_URL,)
+        assert mock_post.call_args.kwargs["data"] == {
+            "smtp_account": settings.EMAILLABS_API_SMTP_ACCOUNT_NAME,
+            "from_name": settings.EMAIL_APP_DISPLAY_NAME,
+            "from": "noreply@example.com",
+            "subject": "Verify your account",
+            "to[user@example.com]": "",
+            "html": "<p>HTML body</p>",
+            "text": "Plain body",
+        }
+
+    def test_plain_message_body_is_sent_as_html(self, backend, mock_post):
+        """Test that a message without alternatives sends its body as html only."""
+        # Arrange
+        message = EmailMessage(
+            "Subject", "Plain body", "noreply@example.com", ["user@example.com"]
+        )
+
+        # Act
+        backend.send_messages([message])
+
+        # Assert
+        data = mock_post.call_args.kwargs["data"]
+        assert data["html"] == "Plain body"
+        assert "text" not in data
+
+    def test_one_request_is_sent_per_recipient(self, backend, mock_post):
+        """Test that each recipient gets its own request."""
+        # Arrange
+        message = EmailMessage(
+            "Subject", "Body", "noreply@example.com", ["a@example.com", "b@example.com"]
+        )
+
+        # Act
+        sent = backend.send_messages([message])
+
+        # Assert
+        assert sent == 2
+        recipients = [
+            next(key for key in call.kwargs["data"] if key.startswith("to["))
+            for call in mock_post.call_args_list
+        ]
+        assert recipients == ["to[a@example.com]", "to[b@example.com]"]
@@ -0,0 +1,70 @@
+"""Cached access to the user_auth tunables defined in settings."""
+
+from functools import cache
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+DEFAULTS = {
+    "EMAIL_VERIFICATION_MAX_RESENDS": 5,
+    "EMAIL_VERIFICATION_COOLDOWN_MINUTES": 10,
+    "EMAIL_VERIFICATION_TOKEN_EXPIRY_DAYS": 1,
+    "EMAIL_VERIFICATION_MAX_ATTEMPTS": 10,
+    "EMAIL_VERIFICATION_ATTEMPTS_WINDOW_MINUTES": 60,
+    "PASSWORD_RESET_MAX_REQUESTS": 5,
+    "PASSWORD_RESET_COOLDOWN_MINUTES": 10,
+    "PASSWORD_RESET_TOKEN_EXPIRY_DAYS": 1,
+}
+
+
+@cache
+def auth_setting(name):
+    """Get a user_auth setting, falling back to its default if unset."""
+    return getattr(settings, name, DEFAULTS[name])
+
+
+class GoogleOAuthConfig(NamedTuple):
+    client_id: str
+    client_secret: str
+    redirect_uri: str
+
+
+@cache
+def google_oauth_config():
+    """Get the Google OAuth client credentials and our callback URL."""
+    app = settings.SOCIALACCOUNT_PROVIDERS["google"]["APP"]
+    return GoogleOAuthConfig(
+        client_id=app["client_id"],
+        client_secret=app["secret"],
+        redirect_uri=f"{settings.BACKEND_URL}/api/v1/auth/social/google/",
+    )
+
+
+class FrontendOAuthURLs(NamedTuple):
+    error: str
+    register: str
+    callback: str
+
+
+@cache
+def frontend_oauth_urls():
+    """Get the frontend URL prefixes the Google callback redirects to."""
+    base = settings.FRONTEND_URL
+    return FrontendOAuthURLs(
+        error=f"{base}/?error=",
+        register=f"{base}/auth/register?",
+        callback=f"{base}/auth/google/callback?",
+    )
+
+
+@receiver(setting_changed)
+def _clear_auth_settings_cache(*, setting, **kwargs):
+    """Drop cached values when settings are overridden (e.g. in tests)."""
+    if setting in DEFAULTS:
+        auth_setting.cache_clear()
+    elif setting in ("SOCIALACCOUNT_PROVIDERS", "BACKEND_URL"):
+        google_oauth_config.cache_clear()
+    elif setting == "FRONTEND_URL":
+        frontend_oauth_urls.cache_clear()
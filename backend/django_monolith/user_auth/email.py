@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core.mail import send_mail
+from django.template.loader import render_to_string
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from user_auth.conf import auth_setting
+from user_auth.utils import expiry_days_phrase
+
+
+def send_verification_email(user, *, registered=False, password_reset=False) -> int:
+    """Send the email verification link to a user.
+
+    Returns the number of messages sent (0 on failure). ``registered`` adds
+    the welcome line shown right after sign-up; ``password_reset`` explains
+    that the address must be verified before a reset is possible.
+    """
+    # Get token expiry from settings (default 1 day)
+    token_expiry_days = auth_setting("EMAIL_VERIFICATION_TOKEN_EXPIRY_DAYS")
+
+    token = default_token_generator.make_token(user)
+    uid = urlsafe_base64_encode(force_bytes(user.pk))
+    verification_url = (
+        f"{settings.FRONTEND_URL}/auth/verify-email?uid={uid}&token={token}"
+    )
+
+    subject = "Verify your Diagramik account"
+    context = {
+        "name": user.first_name or "there",
+        "verification_url": verification_url,
+        "expiry": expiry_days_phrase(token_expiry_days),
+        "registered": registered,
+        "password_reset": password_reset,
+    }
+    text_body = render_to_string("user_auth/email/verification.txt", context)
+    html_body = render_to_string("user_auth/email/verification.html", context)
+
+    return send_mail(
+        subject,
+        text_body,
+        settings.DEFAULT_FROM_EMAIL,
+        [user.email],
+        fail_silently=True,
+        html_message=html_body,
+    )
@@ -0,0 +1,25 @@
+# Generated by Django 6.1.2 on 2026-10-16 23:54
+
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("user_auth", "0007_userprofile"),
+    ]
+
+    operations = [
+        # Duplicates the index backing unique_together ("provider", "uid")
+        migrations.RemoveIndex(
+            model_name="socialaccount",
+            name="user_auth_s_provide_bb9370_idx",
+        ),
+        # Login, registration, password reset and Google OAuth all look users
+        # up by email, which auth.User does not index
+        migrations.RunSQL(
+            sql='CREATE INDEX IF NOT EXISTS "auth_user_email_idx" ON "auth_user" ("email");',
+            reverse_sql='DROP INDEX IF EXISTS "auth_user_email_idx";',
+        ),
+    ]
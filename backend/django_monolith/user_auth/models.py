@@ -1,6 +1,8 @@
 from django.db import models
 from django.conf import settings
 
+from .conf import auth_setting
+
 
 class UserProfile(models.Model):
     """Stores additional user profile information."""
@@ -12,12 +14,12 @@ class UserProfile(models.Model):
     )
     terms_accepted = models.BooleanField(
         default=False,
-        help_text="Whether the user has accepted the terms and conditions"
+        help_text="Whether the user has accepted the terms and conditions",
     )
     terms_accepted_at = models.DateTimeField(
         null=True,
         blank=True,
-        help_text="When the user accepted the terms and conditions"
+        help_text="When the user accepted the terms and conditions",
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -51,12 +53,10 @@ class SocialAccount(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
+        # The unique constraint's index also serves the (provider, uid) lookups
         unique_together = [("provider", "uid")]
         verbose_name = "Social Account"
         verbose_name_plural = "Social Accounts"
-        indexes = [
-            models.Index(fields=["provider", "uid"]),
-        ]
 
     def __str__(self):
         return f"{self.user.email} - {self.provider}"
@@ -90,8 +90,8 @@ class EmailVerificationToken(models.Model):
         from datetime import timedelta
 
         # Get configurable values from settings (with defaults)
-        max_resends = getattr(settings, "EMAIL_VERIFICATION_MAX_RESENDS", 5)
-        cooldown_minutes = getattr(settings, "EMAIL_VERIFICATION_COOLDOWN_MINUTES", 10)
+        max_resends = auth_setting("EMAIL_VERIFICATION_MAX_RESENDS")
+        cooldown_minutes = auth_setting("EMAIL_VERIFICATION_COOLDOWN_MINUTES")
 
         if self.resend_count >= max_resends:
             return False, f"Maximum resend attempts ({max_resends}) reached."
@@ -152,8 +152,8 @@ class PasswordResetToken(models.Model):
         from django.utils import timezone
         from datetime import timedelta
 
-        max_requests = getattr(settings, "PASSWORD_RESET_MAX_REQUESTS", 5)
-        cooldown_minutes = getattr(settings, "PASSWORD_RESET_COOLDOWN_MINUTES", 10)
+        max_requests = auth_setting("PASSWORD_RESET_MAX_REQUESTS")
+        cooldown_minutes = auth_setting("PASSWORD_RESET_COOLDOWN_MINUTES")
 
         if self.request_count >= max_requests:
             return False, f"Maximum password reset requests ({max_requests}) reached."
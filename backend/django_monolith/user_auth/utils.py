@@ -1,3 +1,6 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from rest_framework_simplejwt.tokens import RefreshToken
@@ -16,6 +19,20 @@ class CsrfExemptMixin:
         return super().dispatch(*args, **kwargs)
 
 
+# Sending mail is a blocking call to the mail provider. Running it on a small
+# pool lets the request thread carry on with its DB writes in the meantime.
+_mail_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="auth-mail")
+
+
+def send_mail_in_background(send, *args, **kwargs) -> Future:
+    """Start a mail send off the request thread and return its future.
+
+    The callable must not touch the database - it runs outside the request's
+    connection and transaction.
+    """
+    return _mail_executor.submit(send, *args, **kwargs)
+
+
 def get_tokens_for_user(user):
     """Generate JWT tokens for a user"""
     refresh = RefreshToken.for_user(user)
@@ -25,12 +42,17 @@ def get_tokens_for_user(user):
     }
 
 
-def get_user_data(user):
-    """Get user data for response"""
+def get_user_data(user, terms_accepted=None):
+    """Get user data for response
+
+    Pass ``terms_accepted`` when the caller already knows it, to skip loading
+    the profile.
+    """
     # Get terms acceptance from profile if it exists
-    terms_accepted = False
-    if hasattr(user, "profile"):
-        terms_accepted = user.profile.terms_accepted
+    if terms_accepted is None:
+        terms_accepted = False
+        if hasattr(user, "profile"):
+            terms_accepted = user.profile.terms_accepted
 
     return {
         "pk": user.pk,
@@ -39,3 +61,9 @@ def get_user_data(user):
         "last_name": user.last_name,
         "terms_accepted": terms_accepted,
     }
+
+
+@lru_cache(maxsize=8)
+def expiry_days_phrase(days):
+    """Format a token expiry for emails, e.g. "1 day" or "3 days"."""
+    return f"{days} day{'s' if days > 1 else ''}"
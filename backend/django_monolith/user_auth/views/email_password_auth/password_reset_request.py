@@ -11,10 +11,32 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 
 from user_auth.models import PasswordResetToken
-from user_auth.utils import CsrfExemptMixin
+from user_auth.conf import auth_setting
+from user_auth.email import send_verification_email
+from user_auth.utils import (
+    CsrfExemptMixin,
+    expiry_days_phrase,
+    send_mail_in_background,
+)
 
 User = get_user_model()
 
+RESET_EMAIL_TEMPLATE = """\
+Hello {name},
+
+You requested a password reset. Click the link below to set a new password:
+
+{url}
+
+This link will expire in {expiry}.
+
+Your current password will continue to work until you set a new one.
+
+If you didn't request this reset, you can safely ignore this email.
+
+Best regards,
+The Diagramik Team"""
+
 
 class PasswordResetRequestView(CsrfExemptMixin, APIView):
     """
@@ -82,14 +104,16 @@ class PasswordResetRequestView(CsrfExemptMixin, APIView):
                     status=status.HTTP_429_TOO_MANY_REQUESTS,
                 )
 
+        # Send password reset email while the token record is updated
+        email_sent = send_mail_in_background(self._send_password_reset_email, user)
+
+        if not created:
             # Increment request count
             reset_token.request_count += 1
             reset_token.last_requested_at = timezone.now()
             reset_token.save()
 
-        # Send password reset email
-        sent = self._send_password_reset_email(user)
-        if not sent:
+        if not email_sent.result():
             return Response(
                 {
                     "detail": "Failed to send password reset email. Please try again later."
@@ -109,46 +133,14 @@ class PasswordResetRequestView(CsrfExemptMixin, APIView):
         from user_auth.models import EmailVerificationToken
 
         # Get or create verification token
-        verification_token, _ = EmailVerificationToken.objects.get_or_create(
+        EmailVerificationToken.objects.get_or_create(
             user=user, defaults={"resend_count": 0}
         )
-
-        token_expiry_days = getattr(settings, "EMAIL_VERIFICATION_TOKEN_EXPIRY_DAYS", 1)
-        token = default_token_generator.make_token(user)
-        uid = urlsafe_base64_encode(force_bytes(user.pk))
-        verification_url = (
-            f"{settings.FRONTEND_URL}/auth/verify-email?uid={uid}&token={token}"
-        )
-
-        subject = "Verify your Diagramik account"
-        message = f"""
-Hello {user.first_name or "there"},
-
-You requested a password reset, but your email is not verified yet.
-
-Please verify your email address first by clicking the link below:
-
-{verification_url}
-
-This link will expire in {token_expiry_days} day{"s" if token_expiry_days > 1 else ""}.
-
-After verification, you can reset your password.
-
-Best regards,
-The Diagramik Team
-        """.strip()
-
-        return send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            fail_silently=True,
-        )
+        return send_verification_email(user, password_reset=True)
 
     def _send_password_reset_email(self, user) -> int:
         """Send password reset email for verified users."""
-        token_expiry_days = getattr(settings, "PASSWORD_RESET_TOKEN_EXPIRY_DAYS", 1)
+        token_expiry_days = auth_setting("PASSWORD_RESET_TOKEN_EXPIRY_DAYS")
         token = default_token_generator.make_token(user)
         uid = urlsafe_base64_encode(force_bytes(user.pk))
         reset_url = (
@@ -156,22 +148,11 @@ The Diagramik Team
         )
 
         subject = "Reset your Diagramik password"
-        message = f"""
-Hello {user.first_name or "there"},
-
-You requested a password reset. Click the link below to set a new password:
-
-{reset_url}
-
-This link will expire in {token_expiry_days} day{"s" if token_expiry_days > 1 else ""}.
-
-Your current password will continue to work until you set a new one.
-
-If you didn't request this reset, you can safely ignore this email.
-
-Best regards,
-The Diagramik Team
-        """.strip()
+        message = RESET_EMAIL_TEMPLATE.format(
+            name=user.first_name or "there",
+            url=reset_url,
+            expiry=expiry_days_phrase(token_expiry_days),
+        )
 
         return send_mail(
             subject,
@@ -1,15 +1,17 @@
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.utils.encoding import force_bytes
-from django.utils.http import urlsafe_base64_encode
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 
-from user_auth.utils import CsrfExemptMixin, get_tokens_for_user, get_user_data
+from user_auth.email import send_verification_email
+from user_auth.utils import (
+    CsrfExemptMixin,
+    get_tokens_for_user,
+    get_user_data,
+    send_mail_in_background,
+)
 
 User = get_user_model()
 
@@ -53,15 +55,25 @@ class RegisterView(CsrfExemptMixin, APIView):
         if errors:
             return Response(errors, status=status.HTTP_400_BAD_REQUEST)
 
+        verification_required = settings.ACCOUNT_EMAIL_VERIFICATION == "mandatory"
+
         # Create user with is_active=False if verification is mandatory
         user = User.objects.create_user(
             username=email,
             email=email,
             password=password1,
             first_name=first_name,
-            is_active=(settings.ACCOUNT_EMAIL_VERIFICATION != "mandatory"),
+            is_active=not verification_required,
         )
 
+        # Start sending the verification email (in production) so the
+        # remaining writes overlap with the mail provider round-trip
+        email_sent = None
+        if verification_required:
+            email_sent = send_mail_in_background(
+                send_verification_email, user, registered=True
+            )
+
         # Create user profile with terms acceptance
         from user_auth.models import UserProfile
         from django.utils import timezone
@@ -72,11 +84,14 @@ class RegisterView(CsrfExemptMixin, APIView):
             terms_accepted_at=timezone.now() if terms_accepted else None,
         )
 
-        # Send verification email (in production)
-        if settings.ACCOUNT_EMAIL_VERIFICATION == "mandatory":
-            sent = self._send_verification_email(user)
-            if not sent:
-                # Delete user if email fails
+        if email_sent is not None:
+            # Create verification token record
+            from user_auth.models import EmailVerificationToken
+
+            EmailVerificationToken.objects.create(user=user, resend_count=0)
+
+            if not email_sent.result():
+                # Delete user if email fails (cascades to profile and token)
                 user.delete()
                 return Response(
                     {
@@ -85,11 +100,6 @@ class RegisterView(CsrfExemptMixin, APIView):
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 )
 
-            # Create verification token record
-            from user_auth.models import EmailVerificationToken
-
-            EmailVerificationToken.objects.create(user=user, resend_count=0)
-
             return Response(
                 {"detail": "Verification email sent. Please check your inbox."},
                 status=status.HTTP_201_CREATED,
@@ -104,40 +114,3 @@ class RegisterView(CsrfExemptMixin, APIView):
             },
             status=status.HTTP_201_CREATED,
         )
-
-    def _send_verification_email(self, user) -> int:
-        """Send verification email with expiry information."""
-        # Get token expiry from settings (default 1 day)
-        token_expiry_days = getattr(settings, "EMAIL_VERIFICATION_TOKEN_EXPIRY_DAYS", 1)
-
-        token = default_token_generator.make_token(user)
-        uid = urlsafe_base64_encode(force_bytes(user.pk))
-        verification_url = (
-            f"{settings.FRONTEND_URL}/auth/verify-email?uid={uid}&token={token}"
-        )
-
-        subject = "Verify your Diagramik account"
-        message = f"""
-Hello {user.first_name or "there"},
-
-Thank you for registering with Diagramik!
-
-Please verify your email address by clicking the link below:
-
-{verification_url}
-
-This link will expire in {token_expiry_days} day{"s" if token_expiry_days > 1 else ""}.
-
-If you didn't create this account, you can safely ignore this email.
-
-Best regards,
-The Diagramik Team
-        """.strip()
-
-        return send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            fail_silently=True,
-        )
@@ -1,9 +1,6 @@
-from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.utils.encoding import force_bytes
-from django.utils.http import urlsafe_base64_encode
+from django.core.cache import cache
+from django.db.models import F
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.views import APIView
@@ -11,7 +8,12 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 
 from user_auth.models import EmailVerificationToken
-from user_auth.utils import CsrfExemptMixin
+from user_auth.conf import auth_setting
+from user_auth.email import send_verification_email
+from user_auth.utils import (
+    CsrfExemptMixin,
+    send_mail_in_background,
+)
 
 User = get_user_model()
 
@@ -36,6 +38,15 @@ class ResendVerificationEmailView(CsrfExemptMixin, APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        # Cheap first line of rate limiting, before touching the database
+        if self._too_many_attempts(email):
+            return Response(
+                {
+                    "detail": "Too many verification email requests. Please try again later."
+                },
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+            )
+
         # Check if user exists
         try:
             user = User.objects.get(email=email)
@@ -55,13 +66,19 @@ class ResendVerificationEmailView(CsrfExemptMixin, APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Get or create verification token record
-        verification_token, created = EmailVerificationToken.objects.get_or_create(
-            user=user, defaults={"resend_count": 0}
+        # Load only the rate-limiting fields of the verification token record
+        verification_token = (
+            EmailVerificationToken.objects.filter(user=user)
+            .only("id", "resend_count", "last_sent_at")
+            .first()
         )
-
-        # Check if can resend (rate limiting)
-        if not created:
+        created = verification_token is None
+        if created:
+            verification_token = EmailVerificationToken.objects.create(
+                user=user, resend_count=0
+            )
+        else:
+            # Check if can resend (rate limiting)
             can_resend, error_message = verification_token.can_resend()
             if not can_resend:
                 return Response(
@@ -69,16 +86,21 @@ class ResendVerificationEmailView(CsrfExemptMixin, APIView):
                     status=status.HTTP_429_TOO_MANY_REQUESTS,
                 )
 
-            # Update existing token record
+        # Send verification email while the token record is updated
+        email_sent = send_mail_in_background(send_verification_email, user)
+
+        if not created:
+            # Update existing token record in a single UPDATE of the touched
+            # columns, resetting invalidated status
+            EmailVerificationToken.objects.filter(pk=verification_token.pk).update(
+                resend_count=F("resend_count") + 1,
+                last_sent_at=timezone.now(),
+                is_invalidated=False,
+                invalidated_at=None,
+            )
             verification_token.resend_count += 1
-            verification_token.last_sent_at = timezone.now()
-            verification_token.is_invalidated = False  # Reset invalidated status
-            verification_token.invalidated_at = None
-            verification_token.save()
-
-        # Send verification email
-        sent = self._send_verification_email(user)
-        if not sent:
+
+        if not email_sent.result():
             return Response(
                 {
                     "detail": "Failed to send verification email. Please try again later."
@@ -87,7 +109,7 @@ class ResendVerificationEmailView(CsrfExemptMixin, APIView):
             )
 
         # Get max resends from settings
-        max_resends = getattr(settings, "EMAIL_VERIFICATION_MAX_RESENDS", 5)
+        max_resends = auth_setting("EMAIL_VERIFICATION_MAX_RESENDS")
 
         return Response(
             {
@@ -98,37 +120,22 @@ class ResendVerificationEmailView(CsrfExemptMixin, APIView):
             status=status.HTTP_200_OK,
         )
 
-    def _send_verification_email(self, user) -> int:
-        """Send verification email."""
-        # Get token expiry from settings (default 1 day)
-        token_expiry_days = getattr(settings, "EMAIL_VERIFICATION_TOKEN_EXPIRY_DAYS", 1)
-
-        token = default_token_generator.make_token(user)
-        uid = urlsafe_base64_encode(force_bytes(user.pk))
-        verification_url = (
-            f"{settings.FRONTEND_URL}/auth/verify-email?uid={uid}&token={token}"
-        )
-
-        subject = "Verify your Diagramik account"
-        message = f"""
-Hello {user.first_name or "there"},
-
-Please verify your email address by clicking the link below:
+    def _too_many_attempts(self, email) -> bool:
+        """Count a resend attempt in the cache and check it against the limit.
 
-{verification_url}
+        Every attempt is counted, including rejected ones, so repeated
+        requests are turned away without a DB round-trip. The persisted
+        EmailVerificationToken still enforces the cooldown between sends.
+        """
+        max_attempts = auth_setting("EMAIL_VERIFICATION_MAX_ATTEMPTS")
+        window_minutes = auth_setting("EMAIL_VERIFICATION_ATTEMPTS_WINDOW_MINUTES")
 
-This link will expire in {token_expiry_days} day{"s" if token_expiry_days > 1 else ""}.
-
-If you didn't create this account, you can safely ignore this email.
-
-Best regards,
-The Diagramik Team
-        """.strip()
-
-        return send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            fail_silently=True,
-        )
+        key = f"resend-verification:{email.lower()}"
+        cache.add(key, 0, timeout=window_minutes * 60)
+        try:
+            attempts = cache.incr(key)
+        except ValueError:
+            # Key expired between add() and incr()
+            cache.set(key, 1, timeout=window_minutes * 60)
+            attempts = 1
+        return attempts > max_attempts
@@ -1,7 +1,13 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
-from django.contrib.auth.password_validation import validate_password
+from django.contrib.auth.password_validation import (
+    MinimumLengthValidator,
+    NumericPasswordValidator,
+    get_default_password_validators,
+    validate_password,
+)
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from django.utils.encoding import force_str
 from django.utils.http import urlsafe_base64_decode
 from rest_framework import status
@@ -80,26 +86,25 @@ class SetNewPasswordView(CsrfExemptMixin, APIView):
             )
 
         # Validate new password
-        try:
-            validate_password(new_password, user)
-        except ValidationError as e:
-            return Response(
-                {"detail": e.messages},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        error_response = self._validate_new_password(new_password, user)
+        if error_response:
+            return error_response
 
         # Set new password
         user.set_password(new_password)
         user.save()
 
-        # Mark reset token as used
-        try:
-            reset_token = PasswordResetToken.objects.filter(
-                user=user, is_used=False
-            ).latest("created_at")
-            reset_token.mark_used()
-        except PasswordResetToken.DoesNotExist:
-            pass
+        # Mark the latest reset token as used without loading the row
+        latest_token_id = (
+            PasswordResetToken.objects.filter(user=user, is_used=False)
+            .order_by("-created_at")
+            .values_list("id", flat=True)
+            .first()
+        )
+        if latest_token_id is not None:
+            PasswordResetToken.objects.filter(id=latest_token_id).update(
+                is_used=True, used_at=timezone.now()
+            )
 
         # Generate JWT tokens for immediate login
         tokens = get_tokens_for_user(user)
@@ -131,13 +136,9 @@ class SetNewPasswordView(CsrfExemptMixin, APIView):
             )
 
         # Validate new password
-        try:
-            validate_password(new_password, user)
-        except ValidationError as e:
-            return Response(
-                {"detail": e.messages},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        error_response = self._validate_new_password(new_password, user)
+        if error_response:
+            return error_response
 
         # Set new password
         user.set_password(new_password)
@@ -154,3 +155,33 @@ class SetNewPasswordView(CsrfExemptMixin, APIView):
             },
             status=status.HTTP_200_OK,
         )
+
+    def _validate_new_password(self, new_password, user):
+        """Validate the new password, returning an error response if invalid."""
+        # Reject the common failures cheaply before running the full
+        # validator chain (common-password lookup, attribute similarity),
+        # applying only the checks that AUTH_PASSWORD_VALIDATORS configures
+        quick_errors = []
+        for validator in get_default_password_validators():
+            if isinstance(validator, MinimumLengthValidator):
+                if len(new_password) < validator.min_length:
+                    quick_errors.append(
+                        f"Password must be at least {validator.min_length} characters."
+                    )
+            elif isinstance(validator, NumericPasswordValidator):
+                if new_password.isdigit():
+                    quick_errors.append("This password is entirely numeric.")
+        if quick_errors:
+            return Response(
+                {"detail": quick_errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            validate_password(new_password, user)
+        except ValidationError as e:
+            return Response(
+                {"detail": e.messages},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return None
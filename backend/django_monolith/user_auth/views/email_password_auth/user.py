@@ -18,10 +18,14 @@ class UserView(APIView):
         first_name = request.data.get("first_name")
         last_name = request.data.get("last_name")
 
+        changed_fields = []
         if first_name is not None:
             user.first_name = first_name
+            changed_fields.append("first_name")
         if last_name is not None:
             user.last_name = last_name
+            changed_fields.append("last_name")
 
-        user.save()
+        if changed_fields:
+            user.save(update_fields=changed_fields)
         return Response(get_user_data(user))
@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
+from django.db import transaction
 from django.utils.encoding import force_str
 from django.utils.http import urlsafe_base64_decode
 from rest_framework import status
@@ -46,49 +47,61 @@ class VerifyEmailView(CsrfExemptMixin, APIView):
         # Decode user ID
         try:
             user_id = force_str(urlsafe_base64_decode(uid))
-            user = User.objects.get(pk=user_id)
-        except (TypeError, ValueError, OverflowError, User.DoesNotExist):
-            return Response(
-                {"detail": "Invalid verification link."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        # Check if already verified
-        if user.is_active:
-            return Response(
-                {"detail": "Email already verified. You can log in."},
-                status=status.HTTP_200_OK,
-            )
-
-        # Check token validity
-        if not default_token_generator.check_token(user, token):
-            return Response(
-                {
-                    "detail": "Invalid or expired verification token. Please request a new verification email."
-                },
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        # Check if token was invalidated (resend was requested)
-        try:
-            verification_token = EmailVerificationToken.objects.get(user=user)
-            if verification_token.is_invalidated:
+        except (TypeError, ValueError, OverflowError):
+            return self._invalid_link_response()
+
+        with transaction.atomic():
+            # Lock the user row so concurrent clicks on the same link (e.g. an
+            # email client preview plus the real click) verify only once; the
+            # loser skips the locked row instead of waiting for it
+            try:
+                user = (
+                    User.objects.select_for_update(skip_locked=True)
+                    .filter(pk=user_id)
+                    .first()
+                )
+            except (TypeError, ValueError, OverflowError):
+                return self._invalid_link_response()
+
+            if user is None:
+                if not User.objects.filter(pk=user_id).exists():
+                    return self._invalid_link_response()
+                # Another request is verifying this user right now
+                return self._already_verified_response()
+
+            # Check if already verified
+            if user.is_active:
+                return self._already_verified_response()
+
+            # Check token validity
+            if not default_token_generator.check_token(user, token):
                 return Response(
                     {
-                        "detail": "This verification link has been invalidated. Please use the most recent email."
+                        "detail": "Invalid or expired verification token. Please request a new verification email."
                     },
                     status=status.HTTP_400_BAD_REQUEST,
                 )
-        except EmailVerificationToken.DoesNotExist:
-            pass
-
-        # Verify the user
-        user.is_active = True
-        user.save()
 
-        # Mark token as verified
-        if hasattr(user, "verification_token"):
-            user.verification_token.mark_verified()
+            # Check if token was invalidated (resend was requested)
+            try:
+                verification_token = EmailVerificationToken.objects.get(user=user)
+                if verification_token.is_invalidated:
+                    return Response(
+                        {
+                            "detail": "This verification link has been invalidated. Please use the most recent email."
+                        },
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+            except EmailVerificationToken.DoesNotExist:
+                pass
+
+            # Verify the user
+            user.is_active = True
+            user.save(update_fields=["is_active"])
+
+            # Mark token as verified
+            if hasattr(user, "verification_token"):
+                user.verification_token.mark_verified()
 
         # Generate JWT tokens for immediate login
         tokens = get_tokens_for_user(user)
@@ -101,3 +114,15 @@ class VerifyEmailView(CsrfExemptMixin, APIView):
             },
             status=status.HTTP_200_OK,
         )
+
+    def _invalid_link_response(self):
+        return Response(
+            {"detail": "Invalid verification link."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    def _already_verified_response(self):
+        return Response(
+            {"detail": "Email already verified. You can log in."},
+            status=status.HTTP_200_OK,
+        )
@@ -1,11 +1,29 @@
-from django.conf import settings
-from django.core.signing import TimestampSigner
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
-import json
+from functools import lru_cache
+import time
 from urllib.parse import urlencode
 
+from user_auth.conf import google_oauth_config
+
+from .callback import create_oauth_context_state
+
+# Signed state tokens embed a timestamp, so a cached token is only reused
+# within one bucket of this many seconds before it is re-signed.
+STATE_TOKEN_BUCKET_SECONDS = 30
+
+
+@lru_cache(maxsize=2)
+def _sign_register_state(time_bucket):
+    """Sign the register-page OAuth state once per time bucket."""
+    return create_oauth_context_state({"from_register": True, "terms_accepted": True})
+
+
+def get_register_state_token():
+    """Get a signed state token for users coming from the register page"""
+    return _sign_register_state(int(time.time()) // STATE_TOKEN_BUCKET_SECONDS)
+
 
 class GoogleAuthURLView(APIView):
     """Get Google OAuth URL with optional context encoding"""
@@ -13,26 +31,22 @@ class GoogleAuthURLView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
-        client_id = settings.SOCIALACCOUNT_PROVIDERS["google"]["APP"]["client_id"]
-        callback_url = f"{settings.BACKEND_URL}/api/v1/auth/social/google/"
+        google_app = google_oauth_config()
 
         # Check if this is from register page with terms already accepted
         from_register = request.GET.get("from_register", "").lower() == "true"
         terms_accepted = request.GET.get("terms_accepted", "").lower() == "true"
 
-        # Create OAuth state parameter with context
-        state_data = {}
+        # Create OAuth state parameter with context; the state is signed to
+        # prevent tampering and is the same for every register-page request
+        state_token = ""
         if from_register and terms_accepted:
-            state_data = {"from_register": True, "terms_accepted": True}
-
-        # Sign the state to prevent tampering
-        signer = TimestampSigner()
-        state_token = signer.sign(json.dumps(state_data)) if state_data else ""
+            state_token = get_register_state_token()
 
         # Build OAuth URL
         params = {
-            "client_id": client_id,
-            "redirect_uri": callback_url,
+            "client_id": google_app.client_id,
+            "redirect_uri": google_app.redirect_uri,
             "response_type": "code",
             "scope": "openid email profile",
         }
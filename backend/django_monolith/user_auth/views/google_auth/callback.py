@@ -1,49 +1,320 @@
-from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.shortcuts import redirect
-from django.core.signing import TimestampSigner, BadSignature, SignatureExpired
+from django.core import signing
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
-import requests
+import base64
 import json
+from urllib.parse import quote, urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from user_auth.conf import frontend_oauth_urls, google_oauth_config
 from user_auth.models import SocialAccount, EmailVerificationToken, UserProfile
 from user_auth.utils import get_tokens_for_user, get_user_data
 
 User = get_user_model()
 
 
+# Salts keep the OAuth state and the register redirect token from being
+# accepted in place of each other
+OAUTH_STATE_SALT = "user_auth.google.oauth-state"
+OAUTH_STATE_MAX_AGE = 600
+REGISTER_REDIRECT_SALT = "user_auth.google.register-redirect"
+
+# Signers derive their key material from SECRET_KEY once, at import
+_oauth_state_signer = signing.TimestampSigner(salt=OAUTH_STATE_SALT)
+_register_redirect_signer = signing.TimestampSigner(salt=REGISTER_REDIRECT_SALT)
+
+# One pooled session keeps the TLS connections to Google alive across logins.
+# Retry only covers idempotent requests, so the single-use code exchange POST
+# is never replayed.
+GOOGLE_TIMEOUT = (3.05, 10)
+_google_session = requests.Session()
+_google_session.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=50,
+        max_retries=Retry(
+            total=2, backoff_factor=0.1, status_forcelist=[502, 503, 504]
+        ),
+    ),
+)
+
+
+def create_oauth_context_state(context):
+    """Create a signed OAuth state parameter carrying the request context"""
+    return _oauth_state_signer.sign_object(context)
+
+
 def decode_oauth_context_state(state_param):
     """Decode the OAuth state parameter to get context (from_register, etc.)"""
     if not state_param:
         return {}
 
-    signer = TimestampSigner()
     try:
-        # No max_age check - state is short-lived (only during OAuth redirect)
-        unsigned = signer.unsign(state_param)
-        return json.loads(unsigned)
-    except (BadSignature, SignatureExpired, json.JSONDecodeError):
+        return _oauth_state_signer.unsign_object(
+            state_param, max_age=OAUTH_STATE_MAX_AGE
+        )
+    except signing.BadSignature:
         return {}
 
 
 def create_register_redirect_token(user_data):
-    """Create a signed token containing OAuth user data for register page redirect"""
-    signer = TimestampSigner()
-    return signer.sign(json.dumps(user_data))
+    """Create a signed token containing OAuth user data for register page redirect
+
+    The payload carries Google's profile data and ends up in a redirect URL,
+    so it is zlib-compressed whenever that makes it shorter.
+    """
+    return _register_redirect_signer.sign_object(user_data, compress=True)
 
 
 def verify_register_redirect_token(token, max_age=300):
     """Verify and decode register redirect token (5 min expiry)"""
-    signer = TimestampSigner()
     try:
-        unsigned = signer.unsign(token, max_age=max_age)
-        return json.loads(unsigned)
-    except (BadSignature, SignatureExpired):
+        return _register_redirect_signer.unsign_object(token, max_age=max_age)
+    except signing.BadSignature:
+        return None
+
+
+class GoogleOAuthError(Exception):
+    """Google rejected the code exchange or the userinfo request"""
+
+    def __init__(self, error_code, detail):
+        super().__init__(detail)
+        self.error_code = error_code
+        self.detail = detail
+
+
+# Values Google uses for the iss claim of its ID tokens
+GOOGLE_ID_TOKEN_ISSUERS = frozenset(
+    {"https://accounts.google.com", "accounts.google.com"}
+)
+
+
+def _id_token_claims(id_token, client_id):
+    """Read the claims of an ID token returned by Google's token endpoint
+
+    The token comes straight from Google over TLS, which stands in for the
+    signature check (OpenID Connect Core 3.1.3.7, step 6); the issuer,
+    audience and expiry are still checked. Returns None for a token that is
+    malformed or fails a check, so the caller falls back to userinfo.
+    """
+    try:
+        payload = id_token.split(".")[1]
+        claims = json.loads(
+            base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        )
+    except (IndexError, ValueError):
+        return None
+    if (
+        not isinstance(claims, dict)
+        or claims.get("iss") not in GOOGLE_ID_TOKEN_ISSUERS
+        or claims.get("aud") != client_id
+        or not claims.get("sub")
+    ):
+        return None
+    expires_at = claims.get("exp")
+    if (
+        not isinstance(expires_at, (int, float))
+        or expires_at <= timezone.now().timestamp()
+    ):
+        return None
+    return claims
+
+
+def fetch_google_user(code):
+    """Exchange an authorization code for the Google user's profile
+
+    With the openid scope Google returns an ID token next to the access token.
+    Its claims carry the profile, which saves the userinfo round-trip; the
+    userinfo endpoint is only called when no usable ID token came back.
+    """
+    google_app = google_oauth_config()
+    token_error = GoogleOAuthError(
+        "token_exchange_failed", "Failed to exchange authorization code."
+    )
+    try:
+        token_response = _google_session.post(
+            "https://oauth2.googleapis.com/token",
+            data={
+                "code": code,
+                "client_id": google_app.client_id,
+                "client_secret": google_app.client_secret,
+                "redirect_uri": google_app.redirect_uri,
+                "grant_type": "authorization_code",
+            },
+            timeout=GOOGLE_TIMEOUT,
+        )
+        if token_response.status_code != 200:
+            raise token_error
+        tokens = token_response.json()
+    except requests.RequestException as e:
+        raise token_error from e
+
+    id_token = tokens.get("id_token")
+    claims = _id_token_claims(id_token, google_app.client_id) if id_token else None
+    if claims:
+        # Same shape as the v2 userinfo response
+        return {
+            "id": claims["sub"],
+            "email": claims.get("email"),
+            "verified_email": claims.get("email_verified", False),
+            "name": claims.get("name", ""),
+            "given_name": claims.get("given_name", ""),
+            "family_name": claims.get("family_name", ""),
+            "picture": claims.get("picture", ""),
+        }
+
+    # Get user info from Google
+    userinfo_error = GoogleOAuthError(
+        "userinfo_failed", "Failed to get user info from Google."
+    )
+    try:
+        userinfo_response = _google_session.get(
+            "https://www.googleapis.com/oauth2/v2/userinfo",
+            headers={"Authorization": f"Bearer {tokens.get('access_token')}"},
+            timeout=GOOGLE_TIMEOUT,
+        )
+        if userinfo_response.status_code != 200:
+            raise userinfo_error
+        return userinfo_response.json()
+    except requests.RequestException as e:
+        raise userinfo_error from e
+
+
+def link_google_account(user, google_id, google_user):
+    """Activate an existing user and link their Google account
+
+    Google has verified the email, so the account is activated and its email
+    marked verified.
+    """
+    if not user.is_active:
+        user.is_active = True
+        user.save(update_fields=["is_active"])
+
+    # Ensure verification token exists and is marked verified; callers load
+    # the user with select_related, so these lookups hit the relation cache
+    try:
+        verification_token = user.verification_token
+    except EmailVerificationToken.DoesNotExist:
+        verification_token = EmailVerificationToken.objects.create(user=user)
+    if not verification_token.verified_at:
+        verification_token.mark_verified()
+
+    # Ensure user profile exists (terms acceptance assumed via OAuth)
+    try:
+        user.profile
+    except UserProfile.DoesNotExist:
+        UserProfile.objects.create(
+            user=user,
+            terms_accepted=True,
+            terms_accepted_at=timezone.now(),
+        )
+
+    # Link social account for existing user found by email; looked up by
+    # provider and uid so a concurrent link of the same account is reused
+    SocialAccount.objects.get_or_create(
+        provider="google",
+        uid=google_id,
+        defaults={"user": user, "extra_data": google_user},
+    )
+
+
+def create_google_user(email, first_name, last_name, google_id, google_user):
+    """Create a verified user with accepted terms, linked to their Google account
+
+    All rows are created in one transaction. When a concurrent callback for
+    the same account wins the race, the unique username/uid constraints raise
+    IntegrityError and the user it created is linked instead.
+    """
+    try:
+        with transaction.atomic():
+            user = User.objects.create_user(
+                username=email,
+                email=email,
+                first_name=first_name,
+                last_name=last_name,
+                is_active=True,
+            )
+
+            # Mark email as verified (from Google)
+            verification_token = EmailVerificationToken.objects.create(user=user)
+            verification_token.mark_verified()
+
+            # Create user profile with terms acceptance and timestamp
+            UserProfile.objects.create(
+                user=user,
+                terms_accepted=True,
+                terms_accepted_at=timezone.now(),
+            )
+
+            # Link social account
+            SocialAccount.objects.get_or_create(
+                user=user,
+                provider="google",
+                uid=google_id,
+                defaults={"extra_data": google_user},
+            )
+    except IntegrityError:
+        user = User.objects.select_related("profile", "verification_token").get(
+            username=email
+        )
+        link_google_account(user, google_id, google_user)
+
+    return user
+
+
+def find_or_create_google_user(google_user, create):
+    """Resolve the user for a Google profile
+
+    Looks the user up by linked Google account, then by email, linking the
+    account to an email match. A new user is only created when ``create`` is
+    set (terms were accepted on the register page); otherwise None is
+    returned for unknown users.
+    """
+    email = google_user.get("email")
+    google_id = google_user.get("id")
+
+    # Find user by linked social account; profile and verification token are
+    # joined in so the checks that follow don't issue their own queries
+    user = (
+        User.objects.select_related("profile", "verification_token")
+        .filter(social_accounts__provider="google", social_accounts__uid=google_id)
+        .first()
+    )
+    if user is not None:
+        return user
+
+    # If no social account, try to find user by email
+    user = (
+        User.objects.select_related("profile", "verification_token")
+        .filter(email=email)
+        .first()
+    )
+    if user is not None:
+        # User exists from email/password registration
+        link_google_account(user, google_id, google_user)
+        return user
+
+    if not create:
         return None
 
+    return create_google_user(
+        email,
+        google_user.get("given_name", ""),
+        google_user.get("family_name", ""),
+        google_id,
+        google_user,
+    )
+
 
 class GoogleLoginView(APIView):
     """Handle Google OAuth callback"""
@@ -55,13 +326,14 @@ class GoogleLoginView(APIView):
         """Handle Google OAuth callback redirect"""
         code = request.query_params.get("code")
         error = request.query_params.get("error")
+        frontend_urls = frontend_oauth_urls()
 
         if error:
             # Redirect to frontend with error
-            return redirect(f"{settings.FRONTEND_URL}/?error={error}")
+            return redirect(frontend_urls.error + quote(error))
 
         if not code:
-            return redirect(f"{settings.FRONTEND_URL}/?error=no_code")
+            return redirect(frontend_urls.error + "no_code")
 
         # Get OAuth state parameter from Google
         oauth_state = request.GET.get("state", "")
@@ -69,161 +341,44 @@ class GoogleLoginView(APIView):
         from_register = context.get("from_register", False)
         terms_accepted_on_register = context.get("terms_accepted", False)
 
+        # Exchange code for the Google user's profile
         try:
-            # Exchange code for tokens
-            token_response = requests.post(
-                "https://oauth2.googleapis.com/token",
-                data={
-                    "code": code,
-                    "client_id": settings.SOCIALACCOUNT_PROVIDERS["google"]["APP"][
-                        "client_id"
-                    ],
-                    "client_secret": settings.SOCIALACCOUNT_PROVIDERS["google"]["APP"][
-                        "secret"
-                    ],
-                    "redirect_uri": f"{settings.BACKEND_URL}/api/v1/auth/social/google/",
-                    "grant_type": "authorization_code",
-                },
-            )
-
-            if token_response.status_code != 200:
-                return redirect(f"{settings.FRONTEND_URL}/?error=token_exchange_failed")
-
-            tokens = token_response.json()
-            access_token = tokens.get("access_token")
-
-            # Get user info from Google
-            userinfo_response = requests.get(
-                "https://www.googleapis.com/oauth2/v2/userinfo",
-                headers={"Authorization": f"Bearer {access_token}"},
+            google_user = fetch_google_user(code)
+        except GoogleOAuthError as e:
+            return redirect(frontend_urls.error + e.error_code)
+
+        email = google_user.get("email")
+
+        if not email:
+            return redirect(frontend_urls.error + "no_email")
+
+        user = find_or_create_google_user(
+            google_user, create=from_register and terms_accepted_on_register
+        )
+        if user is None:
+            # User came from login page - redirect to register for terms acceptance
+            state_data = {
+                "email": email,
+                "first_name": google_user.get("given_name", ""),
+                "last_name": google_user.get("family_name", ""),
+                "google_id": google_user.get("id"),
+                "extra_data": google_user,
+            }
+            state_token = create_register_redirect_token(state_data)
+            return redirect(
+                frontend_urls.register + f"oauth_pending=google&state={state_token}"
             )
 
-            if userinfo_response.status_code != 200:
-                return redirect(f"{settings.FRONTEND_URL}/?error=userinfo_failed")
-
-            google_user = userinfo_response.json()
-            email = google_user.get("email")
-            google_id = google_user.get("id")
-            first_name = google_user.get("given_name", "")
-            last_name = google_user.get("family_name", "")
-
-            if not email:
-                return redirect(f"{settings.FRONTEND_URL}/?error=no_email")
-
-            # Find or create user
-            user = None
-
-            # Check if there's a social account linked
-            try:
-                social_account = SocialAccount.objects.get(
-                    provider="google", uid=google_id
-                )
-                user = social_account.user
-            except SocialAccount.DoesNotExist:
-                pass
-
-            # If no social account, try to find user by email
-            if not user:
-                try:
-                    user = User.objects.get(email=email)
-                    # User exists from email/password registration
-                    # Google has verified this email, so activate the account
-                    if not user.is_active:
-                        user.is_active = True
-                        user.save()
-
-                    # Ensure verification token exists and is marked verified
-                    if hasattr(user, "verification_token"):
-                        if not user.verification_token.verified_at:
-                            user.verification_token.mark_verified()
-                    else:
-                        verification_token = EmailVerificationToken.objects.create(
-                            user=user
-                        )
-                        verification_token.mark_verified()
-
-                    # Ensure user profile exists (terms acceptance assumed via OAuth)
-                    if not hasattr(user, "profile"):
-                        from django.utils import timezone
-
-                        UserProfile.objects.create(
-                            user=user,
-                            terms_accepted=True,
-                            terms_accepted_at=timezone.now(),
-                        )
-
-                    # Link social account for existing user found by email
-                    SocialAccount.objects.get_or_create(
-                        user=user,
-                        provider="google",
-                        uid=google_id,
-                        defaults={"extra_data": google_user},
-                    )
-
-                except User.DoesNotExist:
-                    # Check if user came from register page with terms already accepted
-                    if from_register and terms_accepted_on_register:
-                        # Create user immediately - they already accepted terms
-                        user = User.objects.create_user(
-                            username=email,
-                            email=email,
-                            first_name=first_name,
-                            last_name=last_name,
-                            is_active=True,
-                        )
-
-                        # Mark email as verified (from Google)
-                        verification_token = EmailVerificationToken.objects.create(
-                            user=user
-                        )
-                        verification_token.mark_verified()
-
-                        # Create user profile with terms acceptance and timestamp
-                        from django.utils import timezone
-
-                        UserProfile.objects.create(
-                            user=user,
-                            terms_accepted=True,
-                            terms_accepted_at=timezone.now(),
-                        )
-
-                        # Link social account
-                        SocialAccount.objects.create(
-                            user=user,
-                            provider="google",
-                            uid=google_id,
-                            extra_data=google_user,
-                        )
-                    else:
-                        # User came from login page - redirect to register for terms acceptance
-                        state_data = {
-                            "email": email,
-                            "first_name": first_name,
-                            "last_name": last_name,
-                            "google_id": google_id,
-                            "extra_data": google_user,
-                        }
-                        state_token = create_register_redirect_token(state_data)
-                        return redirect(
-                            f"{settings.FRONTEND_URL}/auth/register?"
-                            f"oauth_pending=google&state={state_token}"
-                        )
-
-            jwt_tokens = get_tokens_for_user(user)
-
-            # Redirect to frontend with tokens
-            from urllib.parse import urlencode
-
-            params = urlencode(
-                {
-                    "access": jwt_tokens["access"],
-                    "refresh": jwt_tokens["refresh"],
-                }
-            )
-            return redirect(f"{settings.FRONTEND_URL}/auth/google/callback?{params}")
+        jwt_tokens = get_tokens_for_user(user)
 
-        except Exception:
-            return redirect(f"{settings.FRONTEND_URL}/?error=auth_failed")
+        # Redirect to frontend with tokens
+        params = urlencode(
+            {
+                "access": jwt_tokens["access"],
+                "refresh": jwt_tokens["refresh"],
+            }
+        )
+        return redirect(frontend_urls.callback + params)
 
     def post(self, request):
         code = request.data.get("code")
@@ -240,159 +395,34 @@ class GoogleLoginView(APIView):
         from_register = context.get("from_register", False)
         terms_accepted_on_register = context.get("terms_accepted", False)
 
+        # Exchange code for the Google user's profile
         try:
-            # Exchange code for tokens
-            token_response = requests.post(
-                "https://oauth2.googleapis.com/token",
-                data={
-                    "code": code,
-                    "client_id": settings.SOCIALACCOUNT_PROVIDERS["google"]["APP"][
-                        "client_id"
-                    ],
-                    "client_secret": settings.SOCIALACCOUNT_PROVIDERS["google"]["APP"][
-                        "secret"
-                    ],
-                    "redirect_uri": f"{settings.BACKEND_URL}/api/v1/auth/social/google/",
-                    "grant_type": "authorization_code",
-                },
-            )
-
-            if token_response.status_code != 200:
-                return Response(
-                    {"detail": "Failed to exchange authorization code."},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-
-            tokens = token_response.json()
-            access_token = tokens.get("access_token")
+            google_user = fetch_google_user(code)
+        except GoogleOAuthError as e:
+            return Response({"detail": e.detail}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Get user info from Google
-            userinfo_response = requests.get(
-                "https://www.googleapis.com/oauth2/v2/userinfo",
-                headers={"Authorization": f"Bearer {access_token}"},
-            )
+        email = google_user.get("email")
 
-            if userinfo_response.status_code != 200:
-                return Response(
-                    {"detail": "Failed to get user info from Google."},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-
-            google_user = userinfo_response.json()
-            email = google_user.get("email")
-            google_id = google_user.get("id")
-            first_name = google_user.get("given_name", "")
-            last_name = google_user.get("family_name", "")
-
-            if not email:
-                return Response(
-                    {"detail": "Could not get email from Google."},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-
-            # Find or create user
-            user = None
-
-            # Check if there's a social account linked
-            try:
-                social_account = SocialAccount.objects.get(
-                    provider="google", uid=google_id
-                )
-                user = social_account.user
-            except SocialAccount.DoesNotExist:
-                pass
-
-            # If no social account, try to find user by email
-            if not user:
-                try:
-                    user = User.objects.get(email=email)
-                    # User exists from email/password registration
-                    # Google has verified this email, so activate the account
-                    if not user.is_active:
-                        user.is_active = True
-                        user.save()
-
-                    # Ensure verification token exists and is marked verified
-                    if hasattr(user, "verification_token"):
-                        if not user.verification_token.verified_at:
-                            user.verification_token.mark_verified()
-                    else:
-                        verification_token = EmailVerificationToken.objects.create(
-                            user=user
-                        )
-                        verification_token.mark_verified()
-
-                    # Ensure user profile exists (terms acceptance assumed via OAuth)
-                    if not hasattr(user, "profile"):
-                        from django.utils import timezone
-
-                        UserProfile.objects.create(
-                            user=user,
-                            terms_accepted=True,
-                            terms_accepted_at=timezone.now(),
-                        )
-
-                    # Link social account for existing user found by email
-                    SocialAccount.objects.get_or_create(
-                        user=user,
-                        provider="google",
-                        uid=google_id,
-                        defaults={"extra_data": google_user},
-                    )
-
-                except User.DoesNotExist:
-                    # Check if user came from register page with terms already accepted
-                    if from_register and terms_accepted_on_register:
-                        # Create user immediately - they already accepted terms
-                        user = User.objects.create_user(
-                            username=email,
-                            email=email,
-                            first_name=first_name,
-                            last_name=last_name,
-                            is_active=True,
-                        )
-
-                        # Mark email as verified (from Google)
-                        verification_token = EmailVerificationToken.objects.create(
-                            user=user
-                        )
-                        verification_token.mark_verified()
-
-                        # Create user profile with terms acceptance and timestamp
-                        from django.utils import timezone
-
-                        UserProfile.objects.create(
-                            user=user,
-                            terms_accepted=True,
-                            terms_accepted_at=timezone.now(),
-                        )
-
-                        # Link social account
-                        SocialAccount.objects.create(
-                            user=user,
-                            provider="google",
-                            uid=google_id,
-                            extra_data=google_user,
-                        )
-                    else:
-                        # User came from login page - return error requiring terms acceptance
-                        return Response(
-                            {
-                                "detail": "Terms acceptance required. Please register first."
-                            },
-                            status=status.HTTP_400_BAD_REQUEST,
-                        )
-
-            jwt_tokens = get_tokens_for_user(user)
+        if not email:
             return Response(
-                {
-                    **jwt_tokens,
-                    "user": get_user_data(user),
-                }
+                {"detail": "Could not get email from Google."},
+                status=status.HTTP_400_BAD_REQUEST,
             )
 
-        except Exception as e:
+        user = find_or_create_google_user(
+            google_user, create=from_register and terms_accepted_on_register
+        )
+        if user is None:
+            # User came from login page - return error requiring terms acceptance
             return Response(
-                {"detail": f"Google authentication failed: {str(e)}"},
+                {"detail": "Terms acceptance required. Please register first."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+
+        jwt_tokens = get_tokens_for_user(user)
+        return Response(
+            {
+                **jwt_tokens,
+                "user": get_user_data(user),
+            }
+        )
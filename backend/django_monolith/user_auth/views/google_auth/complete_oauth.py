@@ -5,8 +5,12 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from user_auth.utils import CsrfExemptMixin, get_tokens_for_user, get_user_data
-from user_auth.models import SocialAccount, EmailVerificationToken, UserProfile
-from .callback import verify_register_redirect_token
+from user_auth.models import UserProfile
+from .callback import (
+    create_google_user,
+    link_google_account,
+    verify_register_redirect_token,
+)
 
 User = get_user_model()
 
@@ -51,52 +55,30 @@ class CompleteOAuthRegistrationView(CsrfExemptMixin, APIView):
         google_id = user_data["google_id"]
 
         # Check if user was created in the meantime (race condition protection)
-        try:
-            user = User.objects.get(email=email)
-            # User exists - ensure social account is linked
-            social_account = SocialAccount.objects.filter(
-                provider="google", uid=google_id
-            ).first()
-            if not social_account:
-                SocialAccount.objects.create(
-                    user=user,
-                    provider="google",
-                    uid=google_id,
-                    extra_data=user_data["extra_data"],
-                )
+        user = (
+            User.objects.select_related("profile", "verification_token")
+            .filter(email=email)
+            .first()
+        )
+        if user is not None:
+            # User exists - link the Google account the same way the callback
+            # does, which also ensures the profile exists
+            link_google_account(user, google_id, user_data["extra_data"])
             # Ensure terms are marked as accepted with timestamp
-            profile, _ = UserProfile.objects.get_or_create(user=user)
-            if not profile.terms_accepted:
-                profile.terms_accepted = True
-                profile.terms_accepted_at = timezone.now()
-                profile.save()
-        except User.DoesNotExist:
-            # Create new user
-            user = User.objects.create_user(
-                username=email,
-                email=email,
-                first_name=user_data.get("first_name", ""),
-                last_name=user_data.get("last_name", ""),
-                is_active=True,
-            )
-
-            # Mark email as verified (from Google)
-            verification_token = EmailVerificationToken.objects.create(user=user)
-            verification_token.mark_verified()
-
-            # Create user profile with terms acceptance and timestamp
-            UserProfile.objects.create(
-                user=user, terms_accepted=True, terms_accepted_at=timezone.now()
+            UserProfile.objects.filter(user=user, terms_accepted=False).update(
+                terms_accepted=True, terms_accepted_at=timezone.now()
             )
-
-            # Link social account
-            SocialAccount.objects.create(
-                user=user,
-                provider="google",
-                uid=google_id,
-                extra_data=user_data["extra_data"],
+        else:
+            # Create new user
+            user = create_google_user(
+                email,
+                user_data.get("first_name", ""),
+                user_data.get("last_name", ""),
+                google_id,
+                user_data["extra_data"],
             )
 
         # Issue JWT tokens
         tokens = get_tokens_for_user(user)
-        return Response({**tokens, "user": get_user_data(user)})
+        # Terms were accepted above in both branches
+        return Response({**tokens, "user": get_user_data(user, terms_accepted=True)})
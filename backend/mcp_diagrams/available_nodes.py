@@ -1,323 +1,225 @@
-# ruff: noqa
+"""Diagram node classes exposed to the user code run by ``draw_diagram``.
 
-from diagrams.elastic.elasticsearch import (
-    Alerting,
-    Beats,
-    ElasticSearch,
-    Kibana,
-    LogStash,
-)
-from diagrams.elastic.saas import (
-    Cloud,
-    Elastic,
-)
-from diagrams.firebase.base import Firebase
-from diagrams.generic.compute import Rack
-from diagrams.generic.database import SQL
-from diagrams.generic.device import (
-    Mobile,
-    Tablet,
-)
-from diagrams.generic.network import (
-    VPN,
-    Firewall,
-    Router,
-    Subnet,
-    Switch,
-)
-from diagrams.generic.os import (
-    IOS,
-    Android,
-    Centos,
-    Debian,
-    Raspbian,
-    RedHat,
-    Ubuntu,
-    Windows,
-)
-from diagrams.generic.os import (
-    LinuxGeneral as Linux,
-)
-from diagrams.generic.place import Datacenter
+Names are resolved lazily (PEP 562): the ``diagrams`` submodule behind a name
+is only imported the first time that name is accessed. Set
+``MCP_DIAGRAMS_EAGER=1`` to resolve every name at import instead, so a broken
+entry fails straight away (used by the test task).
+"""
 
-Office = Datacenter
+import importlib
+import os
 
-from diagrams.gcp.analytics import (
-    BigQuery,
-    PubSub,
-)
-from diagrams.gcp.api import (
-    APIGateway,
-    Endpoints,
-)
-from diagrams.gcp.compute import (
-    GCE,
-    GKE,
-    CloudRun,
-    ComputeEngine,
-)
-from diagrams.gcp.compute import (
-    Functions as GcpCloudFunctions,
-)
-from diagrams.gcp.devtools import (
-    Build as CloudBuild,
-)
-from diagrams.gcp.devtools import (
-    CloudShell,
-    ContainerRegistry,
-)
-from diagrams.gcp.devtools import (
-    Scheduler as GcpCloudScheduler,
-)
-from diagrams.gcp.devtools import (
-    Tasks as GcpCloudHttpTasks,
-)
-from diagrams.gcp.management import (
-    Billing as GcpCloudBilling,
-)
-from diagrams.gcp.management import (
-    Project as GcpCloudProject,
-)
-from diagrams.gcp.ml import (
-    TPU as GcpTPU,
-)
-from diagrams.gcp.ml import (
-    AIPlatform as GcpAIPlatform,
-)
-from diagrams.gcp.ml import (
-    InferenceAPI as GcpMlInferenceAPI,
-)
-from diagrams.gcp.ml import (
-    SpeechToText as GcpSpeechToText,
-)
-from diagrams.gcp.ml import (
-    TextToSpeech as GcpTextToSpeech,
-)
-from diagrams.gcp.ml import (
-    TranslationAPI as GcpTranslationAPI,
-)
-from diagrams.gcp.ml import (
-    VertexAI,
-)
-from diagrams.gcp.ml import (
-    VideoIntelligenceAPI as GcpVideoIntelligenceAPI,
-)
-from diagrams.gcp.ml import (
-    VisionAPI as GcpVisionAPI,
-)
-from diagrams.gcp.network import (
-    CDN as GcpCDN,
-)
-from diagrams.gcp.network import (
-    DNS as GcpDNS,
-)
-from diagrams.gcp.network import (
-    VPC as GcpVPC,
-)
-from diagrams.gcp.network import (
-    Armor as GcpCloudArmor,
-)
-from diagrams.gcp.network import (
-    FirewallRules as GcpFirewallRules,
-)
-from diagrams.gcp.operations import (
-    Logging as GcpLogging,
-)
-from diagrams.gcp.operations import (
-    Monitoring as GcpMonitoring,
-)
-from diagrams.gcp.security import (
-    IAP as GcpIAP,
-)
-from diagrams.gcp.security import (
-    KMS as GcpKeyManagementService,
-)
-from diagrams.gcp.security import (
-    Iam as GcpIAM,
-)
-from diagrams.gcp.security import (
-    ResourceManager as GcpResourceManager,
-)
-from diagrams.gcp.security import (
-    SecretManager as GcpSecretManager,
-)
-from diagrams.gcp.storage import (
-    GCS,
-)
-from diagrams.gcp.storage import (
-    Filestore as GcpFilestore,
-)
-from diagrams.gcp.storage import (
-    PersistentDisk as GcpPersistentDisk,
-)
-from diagrams.generic.storage import Storage
-from diagrams.generic.virtualization import (
-    XEN,
-    Qemu,
-    Virtualbox,
-    Vmware,
-)
-from diagrams.onprem.aggregator import Fluentd
-from diagrams.onprem.analytics import (
-    Beam,
-    Databricks,
-    Dbt,
-    Hadoop,
-    Hive,
-    PowerBI,
-    Spark,
-    Tableau,
-)
-from diagrams.onprem.certificates import (
-    CertManager,
-    LetsEncrypt,
-)
-from diagrams.onprem.ci import (
-    CircleCI,
-    GithubActions,
-    GitlabCI,
-    Jenkins,
-)
-from diagrams.onprem.client import (
-    Client,
-    User,
-    Users,
-)
-from diagrams.onprem.compute import (
-    Nomad,
-    Server,
-)
-from diagrams.onprem.container import (
-    K3S,
-    Containerd,
-    Docker,
-)
-from diagrams.onprem.database import (
-    MSSQL,
-    Cassandra,
-    CockroachDB,
-    Duckdb,
-    MariaDB,
-    MongoDB,
-    Neo4J,
-    Oracle,
-    PostgreSQL,
-    Scylla,
-)
-from diagrams.onprem.gitops import ArgoCD
-from diagrams.onprem.groupware import Nextcloud
-from diagrams.onprem.iac import (
-    Ansible,
-    Pulumi,
-    Terraform,
-)
-from diagrams.onprem.inmemory import (
-    Memcached,
-    Redis,
-)
-from diagrams.onprem.mlops import Mlflow
-from diagrams.onprem.monitoring import (
-    Datadog,
-    Grafana,
-    Prometheus,
-    Sentry,
-)
-from diagrams.onprem.network import (
-    Nginx,
-    Traefik,
-)
-from diagrams.onprem.proxmox import ProxmoxVE
-from diagrams.onprem.queue import (
-    Celery,
-    Kafka,
-    RabbitMQ,
-)
-from diagrams.onprem.search import Solr
-from diagrams.onprem.security import (
-    Bitwarden,
-    Trivy,
-    Vault,
-)
-from diagrams.onprem.tracing import (
-    Jaeger,
-    Tempo,
-)
-from diagrams.onprem.vcs import (
-    Git,
-    Github,
-    Gitlab,
-)
-from diagrams.onprem.workflow import (
-    Airflow,
-    Digdag,
-    KubeFlow,
-)
-from diagrams.programming.framework import (
-    Angular,
-    Django,
-    DotNet,
-    FastAPI,
-    Flask,
-    Flutter,
-    GraphQL,
-    Laravel,
-    NextJs,
-    Phoenix,
-    Rails,
-    React,
-    Spring,
-    Svelte,
-    Vue,
-)
-from diagrams.programming.language import (
-    PHP,
-    Bash,
-    C,
-    Cpp,
-    Csharp,
-    Dart,
-    Elixir,
-    Erlang,
-    Go,
-    Java,
-    JavaScript,
-    Kotlin,
-    Latex,
-    Matlab,
-    Python,
-    R,
-    Ruby,
-    Rust,
-    Scala,
-    Swift,
-    TypeScript,
-)
-from diagrams.programming.language import (
-    NodeJS as NodeJs,
-)
-from diagrams.saas.analytics import (
-    Dataform,
-    Snowflake,
-    Stitch,
-)
-from diagrams.saas.automation import N8N
-from diagrams.saas.cdn import (
-    Cloudflare,
-    Fastly,
-)
-from diagrams.saas.chat import (
-    Discord,
-    Messenger,
-    Slack,
-    Teams,
-    Telegram,
-)
-from diagrams.saas.identity import (
-    Auth0,
-    Okta,
-)
-from diagrams.saas.payment import (
-    AmazonPay,
-    Paypal,
-    Stripe,
-)
+# Exported name -> (module, attribute)
+_LAZY = {
+    "Alerting": ("diagrams.elastic.elasticsearch", "Alerting"),
+    "Beats": ("diagrams.elastic.elasticsearch", "Beats"),
+    "ElasticSearch": ("diagrams.elastic.elasticsearch", "ElasticSearch"),
+    "Kibana": ("diagrams.elastic.elasticsearch", "Kibana"),
+    "LogStash": ("diagrams.elastic.elasticsearch", "LogStash"),
+    "Cloud": ("diagrams.elastic.saas", "Cloud"),
+    "Elastic": ("diagrams.elastic.saas", "Elastic"),
+    "Firebase": ("diagrams.firebase.base", "Firebase"),
+    "Rack": ("diagrams.generic.compute", "Rack"),
+    "SQL": ("diagrams.generic.database", "SQL"),
+    "Mobile": ("diagrams.generic.device", "Mobile"),
+    "Tablet": ("diagrams.generic.device", "Tablet"),
+    "VPN": ("diagrams.generic.network", "VPN"),
+    "Firewall": ("diagrams.generic.network", "Firewall"),
+    "Router": ("diagrams.generic.network", "Router"),
+    "Subnet": ("diagrams.generic.network", "Subnet"),
+    "Switch": ("diagrams.generic.network", "Switch"),
+    "IOS": ("diagrams.generic.os", "IOS"),
+    "Android": ("diagrams.generic.os", "Android"),
+    "Centos": ("diagrams.generic.os", "Centos"),
+    "Debian": ("diagrams.generic.os", "Debian"),
+    "Raspbian": ("diagrams.generic.os", "Raspbian"),
+    "RedHat": ("diagrams.generic.os", "RedHat"),
+    "Ubuntu": ("diagrams.generic.os", "Ubuntu"),
+    "Windows": ("diagrams.generic.os", "Windows"),
+    "Linux": ("diagrams.generic.os", "LinuxGeneral"),
+    "Datacenter": ("diagrams.generic.place", "Datacenter"),
+    "Office": ("diagrams.generic.place", "Datacenter"),
+    "BigQuery": ("diagrams.gcp.analytics", "BigQuery"),
+    "PubSub": ("diagrams.gcp.analytics", "PubSub"),
+    "APIGateway": ("diagrams.gcp.api", "APIGateway"),
+    "Endpoints": ("diagrams.gcp.api", "Endpoints"),
+    "GCE": ("diagrams.gcp.compute", "GCE"),
+    "GKE": ("diagrams.gcp.compute", "GKE"),
+    "CloudRun": ("diagrams.gcp.compute", "CloudRun"),
+    "ComputeEngine": ("diagrams.gcp.compute", "ComputeEngine"),
+    "GcpCloudFunctions": ("diagrams.gcp.compute", "Functions"),
+    "CloudBuild": ("diagrams.gcp.devtools", "Build"),
+    "CloudShell": ("diagrams.gcp.devtools", "CloudShell"),
+    "ContainerRegistry": ("diagrams.gcp.devtools", "ContainerRegistry"),
+    "GcpCloudScheduler": ("diagrams.gcp.devtools", "Scheduler"),
+    "GcpCloudHttpTasks": ("diagrams.gcp.devtools", "Tasks"),
+    "GcpCloudBilling": ("diagrams.gcp.management", "Billing"),
+    "GcpCloudProject": ("diagrams.gcp.management", "Project"),
+    "GcpTPU": ("diagrams.gcp.ml", "TPU"),
+    "GcpAIPlatform": ("diagrams.gcp.ml", "AIPlatform"),
+    "GcpMlInferenceAPI": ("diagrams.gcp.ml", "InferenceAPI"),
+    "GcpSpeechToText": ("diagrams.gcp.ml", "SpeechToText"),
+    "GcpTextToSpeech": ("diagrams.gcp.ml", "TextToSpeech"),
+    "GcpTranslationAPI": ("diagrams.gcp.ml", "TranslationAPI"),
+    "VertexAI": ("diagrams.gcp.ml", "VertexAI"),
+    "GcpVideoIntelligenceAPI": ("diagrams.gcp.ml", "VideoIntelligenceAPI"),
+    "GcpVisionAPI": ("diagrams.gcp.ml", "VisionAPI"),
+    "GcpCDN": ("diagrams.gcp.network", "CDN"),
+    "GcpDNS": ("diagrams.gcp.network", "DNS"),
+    "GcpVPC": ("diagrams.gcp.network", "VPC"),
+    "GcpCloudArmor": ("diagrams.gcp.network", "Armor"),
+    "GcpFirewallRules": ("diagrams.gcp.network", "FirewallRules"),
+    "GcpLogging": ("diagrams.gcp.operations", "Logging"),
+    "GcpMonitoring": ("diagrams.gcp.operations", "Monitoring"),
+    "GcpIAP": ("diagrams.gcp.security", "IAP"),
+    "GcpKeyManagementService": ("diagrams.gcp.security", "KMS"),
+    "GcpIAM": ("diagrams.gcp.security", "Iam"),
+    "GcpResourceManager": ("diagrams.gcp.security", "ResourceManager"),
+    "GcpSecretManager": ("diagrams.gcp.security", "SecretManager"),
+    "GCS": ("diagrams.gcp.storage", "GCS"),
+    "GcpFilestore": ("diagrams.gcp.storage", "Filestore"),
+    "GcpPersistentDisk": ("diagrams.gcp.storage", "PersistentDisk"),
+    "Storage": ("diagrams.generic.storage", "Storage"),
+    "XEN": ("diagrams.generic.virtualization", "XEN"),
+    "Qemu": ("diagrams.generic.virtualization", "Qemu"),
+    "Virtualbox": ("diagrams.generic.virtualization", "Virtualbox"),
+    "Vmware": ("diagrams.generic.virtualization", "Vmware"),
+    "Fluentd": ("diagrams.onprem.aggregator", "Fluentd"),
+    "Beam": ("diagrams.onprem.analytics", "Beam"),
+    "Databricks": ("diagrams.onprem.analytics", "Databricks"),
+    "Dbt": ("diagrams.onprem.analytics", "Dbt"),
+    "Hadoop": ("diagrams.onprem.analytics", "Hadoop"),
+    "Hive": ("diagrams.onprem.analytics", "Hive"),
+    "PowerBI": ("diagrams.onprem.analytics", "PowerBI"),
+    "Spark": ("diagrams.onprem.analytics", "Spark"),
+    "Tableau": ("diagrams.onprem.analytics", "Tableau"),
+    "CertManager": ("diagrams.onprem.certificates", "CertManager"),
+    "LetsEncrypt": ("diagrams.onprem.certificates", "LetsEncrypt"),
+    "CircleCI": ("diagrams.onprem.ci", "CircleCI"),
+    "GithubActions": ("diagrams.onprem.ci", "GithubActions"),
+    "GitlabCI": ("diagrams.onprem.ci", "GitlabCI"),
+    "Jenkins": ("diagrams.onprem.ci", "Jenkins"),
+    "Client": ("diagrams.onprem.client", "Client"),
+    "User": ("diagrams.onprem.client", "User"),
+    "Users": ("diagrams.onprem.client", "Users"),
+    "Nomad": ("diagrams.onprem.compute", "Nomad"),
+    "Server": ("diagrams.onprem.compute", "Server"),
+    "K3S": ("diagrams.onprem.container", "K3S"),
+    "Containerd": ("diagrams.onprem.container", "Containerd"),
+    "Docker": ("diagrams.onprem.container", "Docker"),
+    "MSSQL": ("diagrams.onprem.database", "MSSQL"),
+    "Cassandra": ("diagrams.onprem.database", "Cassandra"),
+    "CockroachDB": ("diagrams.onprem.database", "CockroachDB"),
+    "Duckdb": ("diagrams.onprem.database", "Duckdb"),
+    "MariaDB": ("diagrams.onprem.database", "MariaDB"),
+    "MongoDB": ("diagrams.onprem.database", "MongoDB"),
+    "Neo4J": ("diagrams.onprem.database", "Neo4J"),
+    "Oracle": ("diagrams.onprem.database", "Oracle"),
+    "PostgreSQL": ("diagrams.onprem.database", "PostgreSQL"),
+    "Scylla": ("diagrams.onprem.database", "Scylla"),
+    "ArgoCD": ("diagrams.onprem.gitops", "ArgoCD"),
+    "Nextcloud": ("diagrams.onprem.groupware", "Nextcloud"),
+    "Ansible": ("diagrams.onprem.iac", "Ansible"),
+    "Pulumi": ("diagrams.onprem.iac", "Pulumi"),
+    "Terraform": ("diagrams.onprem.iac", "Terraform"),
+    "Memcached": ("diagrams.onprem.inmemory", "Memcached"),
+    "Redis": ("diagrams.onprem.inmemory", "Redis"),
+    "Mlflow": ("diagrams.onprem.mlops", "Mlflow"),
+    "Datadog": ("diagrams.onprem.monitoring", "Datadog"),
+    "Grafana": ("diagrams.onprem.monitoring", "Grafana"),
+    "Prometheus": ("diagrams.onprem.monitoring", "Prometheus"),
+    "Sentry": ("diagrams.onprem.monitoring", "Sentry"),
+    "Nginx": ("diagrams.onprem.network", "Nginx"),
+    "Traefik": ("diagrams.onprem.network", "Traefik"),
+    "ProxmoxVE": ("diagrams.onprem.proxmox", "ProxmoxVE"),
+    "Celery": ("diagrams.onprem.queue", "Celery"),
+    "Kafka": ("diagrams.onprem.queue", "Kafka"),
+    "RabbitMQ": ("diagrams.onprem.queue", "RabbitMQ"),
+    "Solr": ("diagrams.onprem.search", "Solr"),
+    "Bitwarden": ("diagrams.onprem.security", "Bitwarden"),
+    "Trivy": ("diagrams.onprem.security", "Trivy"),
+    "Vault": ("diagrams.onprem.security", "Vault"),
+    "Jaeger": ("diagrams.onprem.tracing", "Jaeger"),
+    "Tempo": ("diagrams.onprem.tracing", "Tempo"),
+    "Git": ("diagrams.onprem.vcs", "Git"),
+    "Github": ("diagrams.onprem.vcs", "Github"),
+    "Gitlab": ("diagrams.onprem.vcs", "Gitlab"),
+    "Airflow": ("diagrams.onprem.workflow", "Airflow"),
+    "Digdag": ("diagrams.onprem.workflow", "Digdag"),
+    "KubeFlow": ("diagrams.onprem.workflow", "KubeFlow"),
+    "Angular": ("diagrams.programming.framework", "Angular"),
+    "Django": ("diagrams.programming.framework", "Django"),
+    "DotNet": ("diagrams.programming.framework", "DotNet"),
+    "FastAPI": ("diagrams.programming.framework", "FastAPI"),
+    "Flask": ("diagrams.programming.framework", "Flask"),
+    "Flutter": ("diagrams.programming.framework", "Flutter"),
+    "GraphQL": ("diagrams.programming.framework", "GraphQL"),
+    "Laravel": ("diagrams.programming.framework", "Laravel"),
+    "NextJs": ("diagrams.programming.framework", "NextJs"),
+    "Phoenix": ("diagrams.programming.framework", "Phoenix"),
+    "Rails": ("diagrams.programming.framework", "Rails"),
+    "React": ("diagrams.programming.framework", "React"),
+    "Spring": ("diagrams.programming.framework", "Spring"),
+    "Svelte": ("diagrams.programming.framework", "Svelte"),
+    "Vue": ("diagrams.programming.framework", "Vue"),
+    "PHP": ("diagrams.programming.language", "PHP"),
+    "Bash": ("diagrams.programming.language", "Bash"),
+    "C": ("diagrams.programming.language", "C"),
+    "Cpp": ("diagrams.programming.language", "Cpp"),
+    "Csharp": ("diagrams.programming.language", "Csharp"),
+    "Dart": ("diagrams.programming.language", "Dart"),
+    "Elixir": ("diagrams.programming.language", "Elixir"),
+    "Erlang": ("diagrams.programming.language", "Erlang"),
+    "Go": ("diagrams.programming.language", "Go"),
+    "Java": ("diagrams.programming.language", "Java"),
+    "JavaScript": ("diagrams.programming.language", "JavaScript"),
+    "Kotlin": ("diagrams.programming.language", "Kotlin"),
+    "Latex": ("diagrams.programming.language", "Latex"),
+    "Matlab": ("diagrams.programming.language", "Matlab"),
+    "Python": ("diagrams.programming.language", "Python"),
+    "R": ("diagrams.programming.language", "R"),
+    "Ruby": ("diagrams.programming.language", "Ruby"),
+    "Rust": ("diagrams.programming.language", "Rust"),
+    "Scala": ("diagrams.programming.language", "Scala"),
+    "Swift": ("diagrams.programming.language", "Swift"),
+    "TypeScript": ("diagrams.programming.language", "TypeScript"),
+    "NodeJs": ("diagrams.programming.language", "NodeJS"),
+    "Dataform": ("diagrams.saas.analytics", "Dataform"),
+    "Snowflake": ("diagrams.saas.analytics", "Snowflake"),
+    "Stitch": ("diagrams.saas.analytics", "Stitch"),
+    "N8N": ("diagrams.saas.automation", "N8N"),
+    "Cloudflare": ("diagrams.saas.cdn", "Cloudflare"),
+    "Fastly": ("diagrams.saas.cdn", "Fastly"),
+    "Discord": ("diagrams.saas.chat", "Discord"),
+    "Messenger": ("diagrams.saas.chat", "Messenger"),
+    "Slack": ("diagrams.saas.chat", "Slack"),
+    "Teams": ("diagrams.saas.chat", "Teams"),
+    "Telegram": ("diagrams.saas.chat", "Telegram"),
+    "Auth0": ("diagrams.saas.identity", "Auth0"),
+    "Okta": ("diagrams.saas.identity", "Okta"),
+    "AmazonPay": ("diagrams.saas.payment", "AmazonPay"),
+    "Paypal": ("diagrams.saas.payment", "Paypal"),
+    "Stripe": ("diagrams.saas.payment", "Stripe"),
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    try:
+        module, attr = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    obj = getattr(importlib.import_module(module), attr)
+    # Cache on the module so later lookups no longer go through __getattr__
+    globals()[name] = obj
+    return obj
+
+
+def __dir__():
+    return list(_LAZY)
+
+
+if os.environ.get("MCP_DIAGRAMS_EAGER"):
+    for _name in _LAZY:
+        __getattr__(_name)
@@ -0,0 +1,32 @@
+"""
+Bake the user-manual guides into ``_guides.py`` as string constants.
+
+Run at image build time, before ``compileall``, so each server worker loads
+the tool descriptions from bytecode instead of reading and decoding the
+markdown files on start. ``server`` falls back to the markdown files when
+the module has not been generated, e.g. in a local checkout.
+"""
+
+from pathlib import Path
+
+USER_MANUAL_DIR = Path(__file__).parent / "data" / "user_manual"
+GUIDES_MODULE = Path(__file__).parent / "_guides.py"
+
+# Constant name in the generated module -> markdown file it is read from
+GUIDES = {
+    "PYTHON_DIAGRAMS_GUIDE": "python_diagrams.md",
+    "MERMAID_GUIDE": "mermaid.md",
+}
+
+
+def bake_guides(target: Path = GUIDES_MODULE) -> None:
+    """Write every guide into ``target`` as a module-level string constant."""
+    lines = ['"""Generated by bake_guides.py; do not edit."""', ""]
+    for name, filename in GUIDES.items():
+        text = (USER_MANUAL_DIR / filename).read_text(encoding="utf-8")
+        lines.append(f"{name} = {text!r}")
+    target.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    bake_guides()
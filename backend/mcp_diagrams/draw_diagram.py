@@ -1,5 +1,65 @@
-from available_nodes import *  # noqa
-from diagrams import Diagram, Cluster, Edge  # noqa
+import ast
+import builtins
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import cache, lru_cache
+from types import CodeType
+
+import available_nodes
+
+_NODE_NAMES = frozenset(available_nodes.__all__)
+
+# Builtins diagram code may use; everything else (open, exec, __import__, ...)
+# is left out of its namespace
+_SAFE_BUILTINS = {
+    name: getattr(builtins, name)
+    for name in (
+        "abs",
+        "all",
+        "any",
+        "bool",
+        "dict",
+        "enumerate",
+        "filter",
+        "float",
+        "int",
+        "isinstance",
+        "len",
+        "list",
+        "map",
+        "max",
+        "min",
+        "print",
+        "range",
+        "reversed",
+        "round",
+        "set",
+        "sorted",
+        "str",
+        "sum",
+        "tuple",
+        "zip",
+    )
+}
+
+
+@cache
+def _base_namespace() -> dict:
+    """Globals shared by all diagram code: safe builtins and diagram primitives.
+
+    Built on first use so importing this module does not import ``diagrams``.
+    ``Diagram`` is left out: draw_diagram opens the diagram itself, and the
+    upstream class writes, renders and deletes files at a caller-given path.
+    """
+    from diagrams import Cluster, Edge, Node
+
+    return {
+        "__builtins__": _SAFE_BUILTINS,
+        "Cluster": Cluster,
+        "Edge": Edge,
+        "Node": Node,
+    }
 
 
 default_graph_attr = {
@@ -11,12 +71,148 @@ default_node_attr = {}
 
 default_edge_attr = {}
 
+# Rendered images of the most recent distinct diagrams, keyed by _render_key
+RENDER_CACHE_SIZE = 64
+_render_cache: OrderedDict[bytes, bytes] = OrderedDict()
+_render_cache_lock = threading.Lock()
+
+
+# Attributes diagram code may use: container and string methods for building
+# node lists and labels. Everything else is rejected, including every
+# _-prefixed attribute (e.g. Node._diagram, which reaches the graphviz object
+# and its file-writing methods) and format/format_map, whose replacement
+# fields can walk attributes from inside a string
+_ALLOWED_ATTRS = frozenset(
+    {
+        "append",
+        "capitalize",
+        "count",
+        "endswith",
+        "extend",
+        "get",
+        "index",
+        "insert",
+        "items",
+        "join",
+        "keys",
+        "lower",
+        "lstrip",
+        "pop",
+        "replace",
+        "rstrip",
+        "split",
+        "startswith",
+        "strip",
+        "title",
+        "update",
+        "upper",
+        "values",
+    }
+)
+
+
+class DiagramCodeError(ValueError):
+    """Raised when diagram code uses a construct the diagram DSL does not allow."""
+
+
+def _validate(tree: ast.Module) -> set[str]:
+    """Check ``tree`` against the diagram DSL and return the names it uses.
+
+    Imports are rejected (every available node is pre-bound), as are dunder
+    names and any attribute outside ``_ALLOWED_ATTRS``, which is how
+    sandboxed code usually reaches back into the interpreter.
+    """
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            raise DiagramCodeError(
+                f"Line {node.lineno}: import statements are not allowed; "
+                "all diagram nodes are already available"
+            )
+        if isinstance(node, ast.Name):
+            if node.id.startswith("__"):
+                raise DiagramCodeError(
+                    f"Line {node.lineno}: name {node.id!r} is not allowed"
+                )
+            names.add(node.id)
+        elif isinstance(node, ast.Attribute) and node.attr not in _ALLOWED_ATTRS:
+            raise DiagramCodeError(
+                f"Line {node.lineno}: attribute {node.attr!r} is not allowed"
+            )
+    return names
+
 
-def draw_diagram(**kwargs):
-    graph_attr = dict(**default_graph_attr, **(kwargs.get("graph_attr", {})))
-    node_attr = dict(**default_node_attr, **(kwargs.get("node_attr", {})))
-    edge_attr = dict(**default_edge_attr, **(kwargs.get("edge_attr", {})))
-    with Diagram(
+@lru_cache(maxsize=256)
+def _compile(source: str) -> tuple[CodeType, dict]:
+    """Validate and compile diagram ``source`` and build the globals it runs with.
+
+    The globals hold a restricted set of builtins, the diagram primitives and
+    only the node classes the code references, resolved through
+    ``available_nodes`` so the diagrams submodules behind unused names are
+    never imported. Both are cached by source; callers must copy the
+    namespace before running code in it.
+    """
+    tree = ast.parse(source, "<diagram>", "exec")
+    names = _validate(tree)
+    code = compile(tree, "<diagram>", "exec")
+
+    namespace = dict(_base_namespace())
+    for name in names & _NODE_NAMES:
+        namespace[name] = getattr(available_nodes, name)
+    return code, namespace
+
+
+def _merge_attrs(defaults: dict, overrides: dict | None) -> dict:
+    """Layer ``overrides`` over ``defaults``, reusing ``defaults`` if there are none.
+
+    Safe because ``Diagram`` copies the attributes instead of keeping the dict.
+    """
+    return {**defaults, **overrides} if overrides else defaults
+
+
+def _render_key(title, code, direction, graph_attr, node_attr, edge_attr) -> bytes:
+    """Fingerprint everything that affects the rendered image.
+
+    The output filename is left out: it only names the Graphviz source.
+    """
+    fingerprint = repr(
+        (
+            title,
+            code,
+            direction,
+            sorted(graph_attr.items()),
+            sorted(node_attr.items()),
+            sorted(edge_attr.items()),
+        )
+    )
+    return hashlib.blake2b(fingerprint.encode(), digest_size=16).digest()
+
+
+def draw_diagram(**kwargs) -> bytes:
+    """Run the diagram code and return the rendered PNG image.
+
+    Images are cached by a fingerprint of their inputs, so requesting the
+    same diagram again skips running the code and Graphviz.
+    """
+    from in_memory_diagram import InMemoryDiagram
+
+    graph_attr = _merge_attrs(default_graph_attr, kwargs.get("graph_attr"))
+    node_attr = _merge_attrs(default_node_attr, kwargs.get("node_attr"))
+    edge_attr = _merge_attrs(default_edge_attr, kwargs.get("edge_attr"))
+    key = _render_key(
+        kwargs.get("title"),
+        kwargs["code"],
+        kwargs.get("direction", "LR"),
+        graph_attr,
+        node_attr,
+        edge_attr,
+    )
+    with _render_cache_lock:
+        if key in _render_cache:
+            _render_cache.move_to_end(key)
+            return _render_cache[key]
+
+    with InMemoryDiagram(
         name=f"\n{kwargs.get('title')}",
         graph_attr=graph_attr,
         node_attr=node_attr,
@@ -24,12 +220,19 @@ def draw_diagram(**kwargs):
         show=False,
         direction=kwargs.get("direction", "LR"),
         filename=kwargs.get("filename"),
-    ):
-        exec(kwargs.get("code"))
+    ) as diagram:
+        code, namespace = _compile(kwargs["code"])
+        exec(code, dict(namespace))
+
+    with _render_cache_lock:
+        _render_cache[key] = diagram.image
+        if len(_render_cache) > RENDER_CACHE_SIZE:
+            _render_cache.popitem(last=False)
+    return diagram.image
 
 
 if __name__ == "__main__":
-    draw_diagram(
+    image = draw_diagram(
         title="Simple",
         code="""
 user = User("User")
@@ -41,3 +244,5 @@ user >> browser >> lb
 """,
         filename="temp",
     )
+    with open("temp.png", "wb") as f:
+        f.write(image)
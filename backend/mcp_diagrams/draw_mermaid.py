@@ -4,21 +4,44 @@ Mermaid diagram tool that encodes Mermaid code into a viewable URL.
 Uses mermaid.ink service to render diagrams from base64-encoded code.
 """
 
-import base64
-import json
+import binascii
 import zlib
+from functools import lru_cache
 
+try:
+    # orjson returns UTF-8 bytes directly and is several times faster
+    from orjson import dumps as _json_bytes
+except ImportError:
+    import json
 
+    def _json_bytes(obj) -> bytes:
+        # Raw UTF-8 like orjson, so the URL does not depend on which is installed
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+# The state object mermaid.ink expects, serialized around the diagram code.
+# Only the code varies, so the rest is kept as pre-encoded JSON bytes.
+_STATE_PREFIX = b'{"code": '
+_STATE_SUFFIX = (
+    b', "mermaid": {"theme": "default"}, "autoSync": true, "updateDiagram": true}'
+)
+
+# Maps the standard base64 alphabet onto the URL-safe one
+_B64_URLSAFE = bytes.maketrans(b"+/", b"-_")
+
+
+@lru_cache(maxsize=1024)
 def encode_mermaid(code: str) -> str:
     """
     Encode Mermaid diagram code into a format suitable for mermaid.ink URLs.
 
+    The encoding is deterministic, so results are cached per code string.
+
     The encoding process:
-    1. Create a JSON object with the diagram code and config
-    2. Encode to UTF-8 bytes
-    3. Compress with zlib (pako compatible)
-    4. Encode to base64
-    5. Make URL-safe
+    1. Splice the JSON-encoded code into the fixed state object (UTF-8)
+    2. Compress with zlib (pako compatible)
+    3. Encode to base64
+    4. Make URL-safe
 
     Args:
         code: Valid Mermaid diagram code
@@ -26,33 +49,31 @@ def encode_mermaid(code: str) -> str:
     Returns:
         Base64-encoded string for use in mermaid.ink URLs
     """
-    # Create the state object that mermaid.ink expects
-    state = {
-        "code": code,
-        "mermaid": {"theme": "default"},
-        "autoSync": True,
-        "updateDiagram": True,
-    }
-
-    # Convert to JSON string
-    json_str = json.dumps(state)
+    # Only the code needs JSON escaping; the rest of the state is constant
+    json_bytes = _STATE_PREFIX + _json_bytes(code) + _STATE_SUFFIX
 
-    # Encode to bytes
-    json_bytes = json_str.encode("utf-8")
-
-    # Compress with zlib (equivalent to pako.deflate)
-    compressed = zlib.compress(json_bytes, level=9)
+    # Compress with zlib (equivalent to pako.deflate); level 6 is much faster
+    # than 9 and only marginally larger on payloads this small
+    compressed = zlib.compress(json_bytes, level=6)
 
     # Base64 encode and make URL-safe
-    b64_encoded = base64.urlsafe_b64encode(compressed).decode("ascii")
+    b64_encoded = (
+        binascii.b2a_base64(compressed, newline=False)
+        .translate(_B64_URLSAFE)
+        .decode("ascii")
+    )
 
     return b64_encoded
 
 
+@lru_cache(maxsize=1024)
 def get_mermaid_url(code: str, output_format: str = "svg") -> str:
     """
     Generate a mermaid.ink URL for the given Mermaid code.
 
+    The URL is a pure function of the code and format, so it is cached on
+    that pair; a resubmitted diagram costs a single dictionary lookup.
+
     Args:
         code: Valid Mermaid diagram code
         output_format: Output format - 'svg' (default), 'png', or 'img'
@@ -0,0 +1,28 @@
+import os
+import threading
+
+from diagrams import Diagram, setdiagram
+
+# Each render runs a Graphviz ``dot`` process. Cap how many run at once so a
+# burst of requests queues instead of oversubscribing the CPUs.
+_RENDER_SLOTS = threading.BoundedSemaphore(os.cpu_count() or 1)
+
+
+class InMemoryDiagram(Diagram):
+    """``Diagram`` that renders the image to bytes instead of writing files.
+
+    The rendered image is available as ``image`` once the context exits. This
+    is the headless path: it never opens a viewer, writes to the working
+    directory or echoes Graphviz warnings.
+    """
+
+    image: bytes | None = None
+
+    def render(self) -> None:
+        with _RENDER_SLOTS:
+            self.image = self.dot.pipe(format=self.outformat, quiet=True)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.render()
+        setdiagram(None)
@@ -1,29 +1,63 @@
 import os
+from functools import cache
+from typing import TYPE_CHECKING
 
-from google.cloud.storage import Client, Blob
+if TYPE_CHECKING:
+    from google.cloud.storage import Blob, Client
 
 
 # Environment configuration
 GCP_PROJECT_ID = os.getenv("GCP_PROJECT_ID", "playground-449613")
 
+# Connections kept open per client. Uploads run on the event loop's default
+# thread pool, which tops out at 32 workers; requests' default of 10 would
+# make the extra threads open and discard a connection on every upload.
+HTTP_POOL_SIZE = 32
 
-def move_file_to_gcs(
-    filename: str, bucket_name: str, project_id: str | None = None
-) -> Blob:
-    """Move a local file to Google Cloud Storage and remove the local copy.
+
+@cache
+def _get_client(project: str) -> "Client":
+    """Return the storage client for ``project``, creating it on first use.
+
+    Building a client discovers credentials and sets up an HTTP session, so
+    one is kept per project, with a connection pool sized for concurrent
+    uploads. google-cloud-storage is imported here so that importing this
+    module stays cheap.
+    """
+    from google.cloud.storage import Client
+    from requests.adapters import HTTPAdapter
+
+    client = Client(project=project)
+    client._http.mount(
+        "https://",
+        HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE),
+    )
+    return client
+
+
+def upload_to_gcs(
+    blob_name: str,
+    data: bytes,
+    bucket_name: str,
+    project_id: str | None = None,
+    content_type: str = "image/png",
+) -> "Blob":
+    """Upload in-memory data to Google Cloud Storage.
+
+    Rendered diagrams are small, so they go out as one multipart request: a
+    single round trip.
 
     Args:
-        filename: Local file path to upload
+        blob_name: Name of the blob to create
+        data: Content to upload
         bucket_name: Target GCS bucket name
         project_id: GCP project ID (defaults to GCP_PROJECT_ID env var)
+        content_type: MIME type stored on the blob
 
     Returns:
         The uploaded Blob object
     """
     project = project_id or GCP_PROJECT_ID
-    client = Client(project=project)
-    bucket = client.bucket(bucket_name)
-    blob = bucket.blob(filename)
-    blob.upload_from_filename(filename)
-    os.remove(filename)
+    blob = _get_client(project).bucket(bucket_name).blob(blob_name)
+    blob.upload_from_string(data, content_type=content_type)
     return blob
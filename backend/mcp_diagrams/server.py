@@ -1,24 +1,40 @@
+import asyncio
+import base64
 import os
+from importlib.util import find_spec
 from pathlib import Path
 
+import anyio
+
 from uuid_utils import uuid7
 from mcp.server.fastmcp import FastMCP
 from draw_diagram import draw_diagram as draw_diagram_tool
 from draw_mermaid import draw_mermaid_diagram
-from move_file_to_gcs import move_file_to_gcs
+from move_file_to_gcs import upload_to_gcs
 from pydantic import BaseModel, Field
 
 
-_USER_MANUAL_DIR = Path(__file__).parent / "data" / "user_manual"
-_PYTHON_DIAGRAMS_GUIDE = (_USER_MANUAL_DIR / "python_diagrams.md").read_text()
-_MERMAID_GUIDE = (_USER_MANUAL_DIR / "mermaid.md").read_text()
+try:
+    # Baked into bytecode at image build time by bake_guides.py
+    from _guides import MERMAID_GUIDE as _MERMAID_GUIDE
+    from _guides import PYTHON_DIAGRAMS_GUIDE as _PYTHON_DIAGRAMS_GUIDE
+except ImportError:
+    _USER_MANUAL_DIR = Path(__file__).parent / "data" / "user_manual"
+    _PYTHON_DIAGRAMS_GUIDE = (_USER_MANUAL_DIR / "python_diagrams.md").read_text()
+    _MERMAID_GUIDE = (_USER_MANUAL_DIR / "mermaid.md").read_text()
+
+
+def _load_config() -> tuple[str, str]:
+    """Read the GCP project and the target bucket from the environment."""
+    project = os.getenv("GCP_PROJECT_ID", "playground-449613")
+    bucket = os.getenv("BUCKET_NAME")
+    if not bucket:
+        raise EnvironmentError("BUCKET_NAME environment variable is not set!")
+    return project, bucket
 
 
 # Environment configuration
-GCP_PROJECT_ID = os.getenv("GCP_PROJECT_ID", "playground-449613")
-BUCKET_NAME = os.getenv("BUCKET_NAME")
-if not BUCKET_NAME:
-    raise EnvironmentError("BUCKET_NAME environment variable is not set!")
+GCP_PROJECT_ID, BUCKET_NAME = _load_config()
 
 
 mcp = FastMCP(
@@ -60,19 +76,32 @@ class TechnicalDiagramArgs(BaseModel):
 
 @mcp.tool(description=_PYTHON_DIAGRAMS_GUIDE)
 async def draw_technical_diagram(args: TechnicalDiagramArgs) -> DrawResult:
-    filename = str(uuid7())
-    kwargs = args.model_dump()
-
-    # Should save the filename under "{filename}.png" path
-    draw_diagram_tool(filename=filename, **kwargs)
-    # Saves the file to GCS and removes it from local FS
-    filename += ".png"
-    new_blob = move_file_to_gcs(
-        filename, bucket_name=BUCKET_NAME, project_id=GCP_PROJECT_ID
+    # 22 URL-safe characters instead of the 36-character hyphenated UUID
+    blob_id = base64.urlsafe_b64encode(uuid7().bytes).rstrip(b"=").decode("ascii")
+    blob_name = f"{blob_id}.png"
+
+    # Renders the PNG in memory and uploads the bytes straight to the blob;
+    # nothing touches the local disk. Both steps block (Graphviz, then GCS),
+    # so they run in worker threads to keep the event loop free
+    image = await asyncio.to_thread(
+        draw_diagram_tool,
+        title=args.title,
+        code=args.code,
+        graph_attr=args.custom_graph_args,
+        node_attr=args.custom_node_args,
+        edge_attr=args.custom_edge_args,
+    )
+    new_blob = await asyncio.to_thread(
+        upload_to_gcs,
+        blob_name,
+        image,
+        bucket_name=BUCKET_NAME,
+        project_id=GCP_PROJECT_ID,
     )
 
     gsutil_uri = f"gs://{new_blob.bucket.name}/{new_blob.name}"
-    return DrawResult(uri=gsutil_uri, title=args.title)
+    # Both fields are strings built or validated above; skip re-validation
+    return DrawResult.model_construct(uri=gsutil_uri, title=args.title)
 
 
 class MermaidArgs(BaseModel):
@@ -92,11 +121,17 @@ class MermaidArgs(BaseModel):
 @mcp.tool(description=_MERMAID_GUIDE)
 async def draw_mermaid(args: MermaidArgs) -> DrawResult:
     result = draw_mermaid_diagram(args.code, args.output_format)
-    return DrawResult(uri=result.get("url"), title=args.title)
+    return DrawResult.model_construct(uri=result["url"], title=args.title)
 
 
 def main():
-    mcp.run("streamable-http")
+    # Same as mcp.run("streamable-http"), but on uvloop's libuv-backed event
+    # loop, which handles many small HTTP exchanges faster. uvloop is in the
+    # diagram-mcp group everywhere except Windows, where it is not available
+    anyio.run(
+        mcp.run_streamable_http_async,
+        backend_options={"use_uvloop": find_spec("uvloop") is not None},
+    )
 
 
 if __name__ == "__main__":
@@ -1,50 +1,79 @@
 """Shared pytest fixtures for MCP diagrams service tests."""
 
 import pytest
-from unittest.mock import MagicMock, AsyncMock
+from unittest.mock import MagicMock, AsyncMock, create_autospec
 import os
 
+# server reads its configuration when it is imported, which test modules do
+# at collection time, before any fixture has run
+os.environ["BUCKET_NAME"] = "test-bucket"
+os.environ["GCP_PROJECT_ID"] = "test-project"
 
-@pytest.fixture
-def mock_gcs_client(mocker):
-    """Mock Google Cloud Storage client."""
-    mock_client = MagicMock()
-    mock_bucket = MagicMock()
-    mock_blob = MagicMock()
+# Import the service modules once, up front, so their import cost is paid
+# during collection rather than inside whichever test happens to run first
+import draw_diagram  # noqa: E402
+import draw_mermaid  # noqa: E402, F401
+import move_file_to_gcs  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def reset_gcs_client():
+    """Drop storage clients cached by move_file_to_gcs between tests."""
+    move_file_to_gcs._get_client.cache_clear()
+    yield
+    move_file_to_gcs._get_client.cache_clear()
 
-    mock_blob.bucket.name = "test-bucket"
-    mock_blob.name = "test-file.png"
-    # Mock the upload_from_filename method to not actually open files
-    mock_blob.upload_from_filename = MagicMock()
-    mock_bucket.blob.return_value = mock_blob
-    mock_client.bucket.return_value = mock_bucket
 
-    mocker.patch("move_file_to_gcs.Client", return_value=mock_client)
-    return mock_client
+@pytest.fixture(autouse=True)
+def reset_render_cache():
+    """Drop images cached by draw_diagram between tests."""
+    draw_diagram._render_cache.clear()
+    yield
+    draw_diagram._render_cache.clear()
+
+
+@pytest.fixture(scope="session")
+def _gcs_mock_template():
+    """Build the spec'd Client -> Bucket -> Blob mock chain once per session."""
+    from google.cloud.storage import Blob, Bucket, Client
+
+    client = create_autospec(Client, instance=True)
+    bucket = create_autospec(Bucket, instance=True)
+    blob = create_autospec(Blob, instance=True)
+    blob.bucket = bucket
+    bucket.blob.return_value = blob
+    client.bucket.return_value = bucket
+    return client, bucket, blob
 
 
 @pytest.fixture
-def mock_file_system(mocker, tmp_path):
-    """Mock file system operations for testing diagram generation."""
-    # Create a temporary directory for test files
-    test_file = tmp_path / "test_diagram.png"
-    test_file.write_text("fake image data")
+def gcs_mocks(_gcs_mock_template):
+    """The (client, bucket, blob) GCS mocks, reset for this test.
 
-    # Mock os.remove to prevent actual file deletion
-    mock_remove = mocker.patch("os.remove")
+    The mocks are shared across tests and reset here, which is much cheaper
+    than building a fresh MagicMock tree for every test.
+    """
+    client, bucket, blob = _gcs_mock_template
+    for mock in (client, bucket, blob):
+        mock.reset_mock(side_effect=True)
+    bucket.name = "test-bucket"
+    blob.name = "test-file.png"
+    return client, bucket, blob
 
-    return {
-        "tmp_path": tmp_path,
-        "test_file": test_file,
-        "mock_remove": mock_remove,
-    }
+
+@pytest.fixture
+def mock_gcs_client(mocker, gcs_mocks):
+    """Mock Google Cloud Storage client."""
+    client, _, _ = gcs_mocks
+    mocker.patch("google.cloud.storage.Client", return_value=client)
+    return client
 
 
 @pytest.fixture
 def mock_diagram_library(mocker):
     """Mock the diagrams library to avoid actual diagram generation."""
     mock_diagram = MagicMock()
-    mocker.patch("draw_diagram.Diagram", return_value=mock_diagram)
+    mocker.patch("in_memory_diagram.InMemoryDiagram", return_value=mock_diagram)
 
     # Mock the context manager
     mock_diagram.__enter__ = MagicMock(return_value=mock_diagram)
@@ -53,7 +82,25 @@ def mock_diagram_library(mocker):
     return mock_diagram
 
 
+@pytest.fixture(scope="session")
+def _diagram_class_template():
+    """Build the InMemoryDiagram class mock once per session."""
+    return MagicMock()
+
+
 @pytest.fixture
+def mock_diagram_class(mocker, _diagram_class_template):
+    """Patch InMemoryDiagram with a mock class, reset for this test.
+
+    The mock's context manager does not suppress exceptions, so errors raised
+    by the diagram code still reach the test.
+    """
+    _diagram_class_template.reset_mock(return_value=True, side_effect=True)
+    mocker.patch("in_memory_diagram.InMemoryDiagram", _diagram_class_template)
+    return _diagram_class_template
+
+
+@pytest.fixture(scope="session")
 def sample_mermaid_code():
     """Provide sample Mermaid diagram code for testing."""
     return """flowchart TD
@@ -1,9 +1,22 @@
 """Integration tests for MCP tools."""
 
+import re
+import threading
+from types import SimpleNamespace
+
 import pytest
 from unittest.mock import patch, MagicMock
 from pydantic import ValidationError
 
+import server
+from draw_mermaid import get_mermaid_url
+from server import (
+    draw_technical_diagram,
+    draw_mermaid,
+    TechnicalDiagramArgs,
+    MermaidArgs,
+)
+
 
 pytestmark = pytest.mark.integration
 
@@ -20,12 +33,11 @@ class TestDrawTechnicalDiagramTool:
 
     @pytest.mark.asyncio
     async def test_draw_technical_diagram_returns_draw_result(
-        self, mock_gcs_client, sample_diagram_code
+        self, gcs_mocks, sample_diagram_code
     ):
         """Test that draw_technical_diagram returns a DrawResult."""
         # Arrange
-        from server import draw_technical_diagram, TechnicalDiagramArgs
-
+        _, _, blob = gcs_mocks
         args = TechnicalDiagramArgs(
             title="Test Architecture",
             code=sample_diagram_code,
@@ -36,14 +48,8 @@ class TestDrawTechnicalDiagramTool:
 
         with (
             patch("server.draw_diagram_tool"),
-            patch("server.move_file_to_gcs") as mock_move,
+            patch("server.upload_to_gcs", return_value=blob),
         ):
-            # Mock the file creation
-            mock_blob = MagicMock()
-            mock_blob.bucket.name = "test-bucket"
-            mock_blob.name = "test-diagram.png"
-            mock_move.return_value = mock_blob
-
             # Act
             result = await draw_technical_diagram(args)
 
@@ -54,12 +60,11 @@ class TestDrawTechnicalDiagramTool:
 
     @pytest.mark.asyncio
     async def test_draw_technical_diagram_calls_draw_function(
-        self, mock_gcs_client, sample_diagram_code
+        self, gcs_mocks, sample_diagram_code
     ):
         """Test that draw_technical_diagram calls the diagram drawing function."""
         # Arrange
-        from server import draw_technical_diagram, TechnicalDiagramArgs
-
+        _, _, blob = gcs_mocks
         args = TechnicalDiagramArgs(
             title="Test Diagram",
             code=sample_diagram_code,
@@ -70,13 +75,8 @@ class TestDrawTechnicalDiagramTool:
 
         with (
             patch("server.draw_diagram_tool") as mock_draw,
-            patch("server.move_file_to_gcs") as mock_move,
+            patch("server.upload_to_gcs", return_value=blob),
         ):
-            mock_blob = MagicMock()
-            mock_blob.bucket.name = "test-bucket"
-            mock_blob.name = "diagram.png"
-            mock_move.return_value = mock_blob
-
             # Act
             await draw_technical_diagram(args)
 
@@ -85,16 +85,43 @@ class TestDrawTechnicalDiagramTool:
             call_kwargs = mock_draw.call_args[1]
             assert call_kwargs["title"] == "Test Diagram"
             assert call_kwargs["code"] == sample_diagram_code
-            assert call_kwargs["custom_graph_args"] == {"rankdir": "TB"}
+            assert call_kwargs["graph_attr"] == {"rankdir": "TB"}
+            assert call_kwargs["node_attr"] == {"shape": "box"}
+            assert call_kwargs["edge_attr"] == {"color": "blue"}
+            assert "filename" not in call_kwargs
+
+    @pytest.mark.asyncio
+    async def test_draw_technical_diagram_applies_custom_attributes(
+        self, gcs_mocks, mock_diagram_class
+    ):
+        """Test that the custom attributes reach the rendered Diagram."""
+        # Arrange
+        _, _, blob = gcs_mocks
+        args = TechnicalDiagramArgs(
+            title="Styled",
+            code="pass",
+            custom_graph_args={"bgcolor": "white"},
+            custom_node_args={"shape": "box"},
+            custom_edge_args={"color": "blue"},
+        )
+
+        with patch("server.upload_to_gcs", return_value=blob):
+            # Act
+            await draw_technical_diagram(args)
+
+        # Assert
+        call_kwargs = mock_diagram_class.call_args.kwargs
+        assert call_kwargs["graph_attr"]["bgcolor"] == "white"
+        assert call_kwargs["node_attr"]["shape"] == "box"
+        assert call_kwargs["edge_attr"]["color"] == "blue"
 
     @pytest.mark.asyncio
     async def test_draw_technical_diagram_uploads_to_gcs(
-        self, mock_gcs_client, sample_diagram_code
+        self, gcs_mocks, sample_diagram_code
     ):
         """Test that draw_technical_diagram uploads file to GCS."""
         # Arrange
-        from server import draw_technical_diagram, TechnicalDiagramArgs
-
+        _, _, blob = gcs_mocks
         args = TechnicalDiagramArgs(
             title="Cloud Architecture",
             code=sample_diagram_code,
@@ -104,32 +131,27 @@ class TestDrawTechnicalDiagramTool:
         )
 
         with (
-            patch("server.draw_diagram_tool"),
-            patch("server.move_file_to_gcs") as mock_move,
+            patch("server.draw_diagram_tool") as mock_draw,
+            patch("server.upload_to_gcs", return_value=blob) as mock_upload,
         ):
-            mock_blob = MagicMock()
-            mock_blob.bucket.name = "diagrams-bucket"
-            mock_blob.name = "cloud-arch.png"
-            mock_move.return_value = mock_blob
-
             # Act
             await draw_technical_diagram(args)
 
             # Assert
-            mock_move.assert_called_once()
-            # Verify filename ends with .png
-            call_args = mock_move.call_args
+            mock_upload.assert_called_once()
+            # Verify filename ends with .png and the rendered image is uploaded
+            call_args = mock_upload.call_args
             assert call_args[0][0].endswith(".png")
+            assert call_args[0][1] is mock_draw.return_value
             assert call_args[1]["bucket_name"] == "test-bucket"
 
     @pytest.mark.asyncio
     async def test_draw_technical_diagram_generates_unique_filenames(
-        self, mock_gcs_client, sample_diagram_code
+        self, gcs_mocks, sample_diagram_code
     ):
         """Test that each diagram gets a unique filename."""
         # Arrange
-        from server import draw_technical_diagram, TechnicalDiagramArgs
-
+        _, _, blob = gcs_mocks
         args = TechnicalDiagramArgs(
             title="Diagram",
             code=sample_diagram_code,
@@ -142,29 +164,22 @@ class TestDrawTechnicalDiagramTool:
 
         with (
             patch("server.draw_diagram_tool"),
-            patch("server.move_file_to_gcs") as mock_move,
+            patch("server.upload_to_gcs", return_value=blob) as mock_upload,
         ):
-            mock_blob = MagicMock()
-            mock_blob.bucket.name = "test-bucket"
-            mock_blob.name = "diagram.png"
-            mock_move.return_value = mock_blob
-
             # Act - create multiple diagrams
             for _ in range(3):
                 await draw_technical_diagram(args)
-                filename = mock_move.call_args[0][0]
+                filename = mock_upload.call_args[0][0]
                 filenames.append(filename)
 
             # Assert - all filenames should be unique
             assert len(filenames) == 3
             assert len(set(filenames)) == 3  # All unique
+            assert all(re.fullmatch(r"[\w-]{22}\.png", name) for name in filenames)
 
     @pytest.mark.asyncio
     async def test_draw_technical_diagram_validation_error(self):
         """Test that invalid arguments raise validation error."""
-        # Arrange
-        from server import TechnicalDiagramArgs
-
         # Act & Assert
         with pytest.raises(ValidationError):
             TechnicalDiagramArgs(
@@ -174,12 +189,11 @@ class TestDrawTechnicalDiagramTool:
 
     @pytest.mark.asyncio
     async def test_draw_technical_diagram_with_all_custom_args(
-        self, mock_gcs_client, sample_diagram_code
+        self, gcs_mocks, sample_diagram_code
     ):
         """Test draw_technical_diagram with all custom arguments."""
         # Arrange
-        from server import draw_technical_diagram, TechnicalDiagramArgs
-
+        _, _, blob = gcs_mocks
         args = TechnicalDiagramArgs(
             title="Complete Test",
             code=sample_diagram_code,
@@ -190,13 +204,8 @@ class TestDrawTechnicalDiagramTool:
 
         with (
             patch("server.draw_diagram_tool") as mock_draw,
-            patch("server.move_file_to_gcs") as mock_move,
+            patch("server.upload_to_gcs", return_value=blob),
         ):
-            mock_blob = MagicMock()
-            mock_blob.bucket.name = "test-bucket"
-            mock_blob.name = "complete.png"
-            mock_move.return_value = mock_blob
-
             # Act
             result = await draw_technical_diagram(args)
 
@@ -204,6 +213,38 @@ class TestDrawTechnicalDiagramTool:
             assert result.title == "Complete Test"
             mock_draw.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_draw_technical_diagram_renders_and_uploads_off_the_event_loop(
+        self, sample_diagram_code
+    ):
+        """Test that the blocking render and upload run in worker threads."""
+        # Arrange
+        args = TechnicalDiagramArgs(
+            title="Threaded",
+            code=sample_diagram_code,
+            custom_graph_args=None,
+            custom_node_args=None,
+            custom_edge_args=None,
+        )
+        threads = []
+        # Only read back as blob.bucket.name and blob.name, so no mock needed
+        blob = SimpleNamespace(name="threaded.png", bucket=SimpleNamespace(name="b"))
+
+        def record_thread(*args, **kwargs):
+            threads.append(threading.current_thread())
+            return blob
+
+        with (
+            patch("server.draw_diagram_tool", side_effect=record_thread),
+            patch("server.upload_to_gcs", side_effect=record_thread),
+        ):
+            # Act
+            await draw_technical_diagram(args)
+
+        # Assert
+        assert len(threads) == 2
+        assert threading.main_thread() not in threads
+
 
 class TestDrawMermaidTool:
     """Integration tests for draw_mermaid MCP tool."""
@@ -212,8 +253,6 @@ class TestDrawMermaidTool:
     async def test_draw_mermaid_returns_draw_result(self, sample_mermaid_code):
         """Test that draw_mermaid returns a DrawResult."""
         # Arrange
-        from server import draw_mermaid, MermaidArgs
-
         args = MermaidArgs(
             code=sample_mermaid_code,
             title="Test Flowchart",
@@ -226,14 +265,12 @@ class TestDrawMermaidTool:
         # Assert
         assert result.title == "Test Flowchart"
         assert result.uri is not None
-        assert "mermaid.ink" in result.uri
+        assert result.uri.startswith("https://mermaid.ink/")
 
     @pytest.mark.asyncio
     async def test_draw_mermaid_svg_format(self, sample_mermaid_code):
         """Test draw_mermaid with SVG format."""
         # Arrange
-        from server import draw_mermaid, MermaidArgs
-
         args = MermaidArgs(
             code=sample_mermaid_code,
             title="SVG Diagram",
@@ -244,14 +281,12 @@ class TestDrawMermaidTool:
         result = await draw_mermaid(args)
 
         # Assert
-        assert "svg" in result.uri
+        assert result.uri.startswith("https://mermaid.ink/svg/pako:")
 
     @pytest.mark.asyncio
     async def test_draw_mermaid_png_format(self, sample_mermaid_code):
         """Test draw_mermaid with PNG format."""
         # Arrange
-        from server import draw_mermaid, MermaidArgs
-
         args = MermaidArgs(
             code=sample_mermaid_code,
             title="PNG Diagram",
@@ -262,14 +297,12 @@ class TestDrawMermaidTool:
         result = await draw_mermaid(args)
 
         # Assert
-        assert "png" in result.uri
+        assert result.uri.endswith("?type=png")
 
     @pytest.mark.asyncio
     async def test_draw_mermaid_default_format(self, sample_mermaid_code):
         """Test draw_mermaid with default format."""
         # Arrange
-        from server import draw_mermaid, MermaidArgs
-
         args = MermaidArgs(
             code=sample_mermaid_code,
             title="Default Format",
@@ -279,14 +312,11 @@ class TestDrawMermaidTool:
         result = await draw_mermaid(args)
 
         # Assert
-        assert "svg" in result.uri
+        assert result.uri.startswith("https://mermaid.ink/svg/pako:")
 
     @pytest.mark.asyncio
     async def test_draw_mermaid_validation_error(self):
         """Test that invalid arguments raise validation error."""
-        # Arrange
-        from server import MermaidArgs
-
         # Act & Assert
         with pytest.raises(ValidationError):
             MermaidArgs(
@@ -298,8 +328,6 @@ class TestDrawMermaidTool:
     async def test_draw_mermaid_with_sequence_diagram(self):
         """Test draw_mermaid with sequence diagram code."""
         # Arrange
-        from server import draw_mermaid, MermaidArgs
-
         sequence_code = """sequenceDiagram
     Alice->>Bob: Hello Bob!
     Bob-->>Alice: Hi Alice!"""
@@ -315,14 +343,12 @@ class TestDrawMermaidTool:
 
         # Assert
         assert result.title == "Sequence Diagram"
-        assert "mermaid.ink" in result.uri
+        assert result.uri.startswith("https://mermaid.ink/")
 
     @pytest.mark.asyncio
     async def test_draw_mermaid_url_format(self, sample_mermaid_code):
         """Test that draw_mermaid returns properly formatted URL."""
         # Arrange
-        from server import draw_mermaid, MermaidArgs
-
         args = MermaidArgs(
             code=sample_mermaid_code,
             title="URL Test",
@@ -333,8 +359,26 @@ class TestDrawMermaidTool:
         result = await draw_mermaid(args)
 
         # Assert
-        assert result.uri.startswith("https://")
-        assert "pako:" in result.uri
+        assert result.uri.startswith("https://mermaid.ink/svg/pako:")
+
+    @pytest.mark.asyncio
+    async def test_draw_mermaid_reuses_url_for_resubmitted_code(
+        self, sample_mermaid_code
+    ):
+        """Test that resubmitting the same diagram is served from the URL cache."""
+        # Arrange
+        get_mermaid_url.cache_clear()
+        first = MermaidArgs(code=sample_mermaid_code, title="First")
+        retry = MermaidArgs(code=f"  {sample_mermaid_code}\n", title="Retry")
+
+        # Act
+        first_result = await draw_mermaid(first)
+        retry_result = await draw_mermaid(retry)
+
+        # Assert
+        assert retry_result.uri == first_result.uri
+        assert retry_result.title == "Retry"
+        assert get_mermaid_url.cache_info().hits == 1
 
 
 class TestMCPServerConfiguration:
@@ -347,11 +391,7 @@ class TestMCPServerConfiguration:
 
         # Act & Assert
         with pytest.raises(EnvironmentError, match="BUCKET_NAME"):
-            # This will trigger the import and environment check
-            import importlib
-            import server
-
-            importlib.reload(server)
+            server._load_config()
 
     def test_mcp_server_uses_env_vars(self, monkeypatch):
         """Test that MCP server uses environment variables."""
@@ -360,14 +400,30 @@ class TestMCPServerConfiguration:
         monkeypatch.setenv("GCP_PROJECT_ID", "env-test-project")
 
         # Act
-        import importlib
-        import server
+        project, bucket = server._load_config()
 
-        importlib.reload(server)
+        # Assert
+        assert bucket == "env-test-bucket"
+        assert project == "env-test-project"
+
+    @pytest.mark.parametrize("installed", [True, False])
+    def test_main_uses_uvloop_only_when_installed(self, installed):
+        """Test that main serves streamable-http on uvloop if it is available."""
+        # Arrange
+        spec = MagicMock() if installed else None
+
+        with (
+            patch("server.find_spec", return_value=spec),
+            patch("server.anyio.run") as mock_run,
+        ):
+            # Act
+            server.main()
 
         # Assert
-        assert server.BUCKET_NAME == "env-test-bucket"
-        assert server.GCP_PROJECT_ID == "env-test-project"
+        mock_run.assert_called_once_with(
+            server.mcp.run_streamable_http_async,
+            backend_options={"use_uvloop": installed},
+        )
 
 
 class TestMCPToolsEndToEnd:
@@ -375,12 +431,11 @@ class TestMCPToolsEndToEnd:
 
     @pytest.mark.asyncio
     async def test_complete_technical_diagram_workflow(
-        self, mock_gcs_client, sample_diagram_code
+        self, gcs_mocks, sample_diagram_code
     ):
         """Test complete workflow for technical diagram creation."""
         # Arrange
-        from server import draw_technical_diagram, TechnicalDiagramArgs
-
+        _, bucket, blob = gcs_mocks
         args = TechnicalDiagramArgs(
             title="Complete Workflow Test",
             code=sample_diagram_code,
@@ -389,17 +444,13 @@ class TestMCPToolsEndToEnd:
             custom_edge_args={"arrowsize": "0.5"},
         )
 
+        bucket.name = "production-bucket"
+        blob.name = "architecture-v1.png"
+
         with (
             patch("server.draw_diagram_tool") as mock_draw,
-            patch("server.move_file_to_gcs") as mock_move,
-            patch("os.remove"),
+            patch("server.upload_to_gcs", return_value=blob) as mock_upload,
         ):
-            # Mock successful upload
-            mock_blob = MagicMock()
-            mock_blob.bucket.name = "production-bucket"
-            mock_blob.name = "architecture-v1.png"
-            mock_move.return_value = mock_blob
-
             # Act
             result = await draw_technical_diagram(args)
 
@@ -408,7 +459,7 @@ class TestMCPToolsEndToEnd:
             mock_draw.assert_called_once()
 
             # 2. File was uploaded to GCS
-            mock_move.assert_called_once()
+            mock_upload.assert_called_once()
 
             # 3. Result contains proper GCS URI
             assert result.uri == "gs://production-bucket/architecture-v1.png"
@@ -418,8 +469,6 @@ class TestMCPToolsEndToEnd:
     async def test_complete_mermaid_workflow(self, sample_mermaid_code):
         """Test complete workflow for Mermaid diagram creation."""
         # Arrange
-        from server import draw_mermaid, MermaidArgs
-
         args = MermaidArgs(
             code=sample_mermaid_code,
             title="Complete Mermaid Test",
@@ -435,10 +484,10 @@ class TestMCPToolsEndToEnd:
         assert isinstance(result.uri, str)
 
         # 2. URL points to mermaid.ink
-        assert "mermaid.ink" in result.uri
+        assert result.uri.startswith("https://mermaid.ink/")
 
         # 3. Title is preserved
         assert result.title == "Complete Mermaid Test"
 
         # 4. Format is correct
-        assert "png" in result.uri
+        assert result.uri.endswith("?type=png")
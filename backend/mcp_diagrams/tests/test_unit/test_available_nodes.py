@@ -0,0 +1,83 @@
+"""Unit tests for the lazily resolved diagram node table."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import available_nodes
+
+
+pytestmark = pytest.mark.unit
+
+
+class TestAvailableNodes:
+    """Tests for the PEP 562 lazy loader in available_nodes."""
+
+    def _loaded_diagram_modules(self, **env):
+        """Import available_nodes in a fresh interpreter and list diagrams modules."""
+        script = (
+            "import sys, available_nodes; "
+            "print(sorted(m for m in sys.modules if m.startswith('diagrams.')))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(available_nodes.__file__).parent,
+            env={**os.environ, **env},
+        )
+        return result.stdout.strip()
+
+    def test_import_does_not_load_diagram_submodules(self, monkeypatch):
+        """Test that importing the module imports no diagrams node modules."""
+        # Arrange
+        monkeypatch.delenv("MCP_DIAGRAMS_EAGER", raising=False)
+
+        # Act
+        loaded = self._loaded_diagram_modules()
+
+        # Assert
+        assert loaded == "[]"
+
+    def test_eager_mode_resolves_every_name_on_import(self):
+        """Test that MCP_DIAGRAMS_EAGER imports the node modules up front."""
+        # Act
+        loaded = self._loaded_diagram_modules(MCP_DIAGRAMS_EAGER="1")
+
+        # Assert
+        assert "diagrams.onprem.database" in loaded
+        assert "diagrams.saas.payment" in loaded
+
+    def test_name_resolves_to_diagrams_class(self):
+        """Test that an exported name resolves to the aliased diagrams class."""
+        # Act
+        from diagrams.generic.place import Datacenter
+        from diagrams.onprem.database import PostgreSQL
+
+        # Assert
+        assert available_nodes.PostgreSQL is PostgreSQL
+        assert available_nodes.Office is Datacenter
+
+    def test_resolved_name_is_cached_in_module_globals(self):
+        """Test that a resolved name is stored on the module."""
+        # Act
+        node_class = available_nodes.Redis
+
+        # Assert
+        assert vars(available_nodes)["Redis"] is node_class
+
+    def test_unknown_name_raises_attribute_error(self):
+        """Test that an unknown name raises AttributeError."""
+        # Act & Assert
+        with pytest.raises(AttributeError):
+            available_nodes.NotADiagramNode  # noqa: B018
+
+    def test_dir_and_all_list_every_exported_name(self):
+        """Test that dir() and __all__ expose the full node table."""
+        # Assert
+        assert "PostgreSQL" in available_nodes.__all__
+        assert set(available_nodes.__all__) <= set(dir(available_nodes))
@@ -0,0 +1,27 @@
+"""Unit tests for baking the user-manual guides into a module."""
+
+import runpy
+
+import pytest
+
+from bake_guides import GUIDES, USER_MANUAL_DIR, bake_guides
+
+
+pytestmark = pytest.mark.unit
+
+
+class TestBakeGuides:
+    """Tests for the build-time guide baking step."""
+
+    def test_baked_constants_match_markdown_files(self, tmp_path):
+        """Test that every generated constant equals its markdown source."""
+        # Arrange
+        target = tmp_path / "_guides.py"
+
+        # Act
+        bake_guides(target)
+
+        # Assert
+        module = runpy.run_path(str(target))
+        for name, filename in GUIDES.items():
+            assert module[name] == (USER_MANUAL_DIR / filename).read_text()
@@ -3,36 +3,58 @@
 import pytest
 import base64
 import json
+import string
 import zlib
 from draw_mermaid import encode_mermaid, get_mermaid_url, draw_mermaid_diagram
 
 
 pytestmark = pytest.mark.unit
 
+# zlib's default header (0x78 0x9c) as it appears at the start of the payload
+ZLIB_HEADER_B64 = "eJ"
+URLSAFE_B64_ALPHABET = set(string.ascii_letters + string.digits + "-_=")
+
+# A small diagram and its mermaid.ink payload, pinned so that any change to
+# the state object, zlib level or base64 alphabet fails the tests
+GOLDEN_CODE = "flowchart TD\n    A-->B"
+GOLDEN_PAYLOAD = (
+    "eJwtyjEKgDAMQNGrhMz2Ag6C4g10dAlttAVrpaSISO9uEP_4-A_a5BhbwHVPl_WUBeZxOUDrjekG"
+    "bAAj50jB6fWgeI7f73ilsgtWHahImu7DqksurFJOR8JjoC1T_Lm-NFEi2g=="
+)
+
+
+@pytest.fixture(scope="module")
+def encoded(sample_mermaid_code):
+    """Encode the sample diagram once for every URL format test."""
+    return encode_mermaid(sample_mermaid_code)
+
+
+@pytest.fixture(scope="module")
+def expected_urls():
+    """The golden diagram's URL per output format, built from the literal payload."""
+    return {
+        "svg": f"https://mermaid.ink/svg/pako:{GOLDEN_PAYLOAD}",
+        "png": f"https://mermaid.ink/img/pako:{GOLDEN_PAYLOAD}?type=png",
+        "img": f"https://mermaid.ink/img/pako:{GOLDEN_PAYLOAD}",
+    }
+
 
 class TestEncodeMermaid:
     """Tests for Mermaid code encoding."""
 
-    def test_encode_mermaid_produces_base64_string(self, sample_mermaid_code):
-        """Test that encode_mermaid returns a base64-encoded string."""
+    def test_encode_mermaid_matches_golden_payload(self):
+        """Test that encode_mermaid produces the pinned payload byte for byte."""
+        # Arrange
+        encode_mermaid.cache_clear()
+
         # Act
-        result = encode_mermaid(sample_mermaid_code)
+        result = encode_mermaid(GOLDEN_CODE)
 
         # Assert
-        assert isinstance(result, str)
-        assert len(result) > 0
-
-        # Verify it's valid base64 (should not raise)
-        try:
-            base64.urlsafe_b64decode(result)
-        except Exception as e:
-            pytest.fail(f"Result is not valid base64: {e}")
+        assert result == GOLDEN_PAYLOAD
 
-    def test_encode_mermaid_is_decodable(self, sample_mermaid_code):
+    def test_encode_mermaid_is_decodable(self, sample_mermaid_code, encoded):
         """Test that encoded Mermaid can be decoded back to original."""
-        # Arrange
-        encoded = encode_mermaid(sample_mermaid_code)
-
         # Act - decode back
         decoded_bytes = base64.urlsafe_b64decode(encoded)
         decompressed = zlib.decompress(decoded_bytes)
@@ -43,22 +65,26 @@ class TestEncodeMermaid:
         assert state["mermaid"]["theme"] == "default"
         assert state["autoSync"] is True
 
-    def test_encode_mermaid_with_simple_code(self):
-        """Test encoding of simple Mermaid code."""
+    def test_encode_mermaid_round_trips_non_ascii_code(self):
+        """Test that non-ASCII labels survive encoding as raw UTF-8."""
         # Arrange
-        simple_code = "flowchart TD\\n    A-->B"
+        code = 'flowchart TD\n    A["Zażółć \\"gęślą\\""] --> B[日本]'
 
         # Act
-        result = encode_mermaid(simple_code)
+        encoded = encode_mermaid(code)
 
         # Assert
-        assert isinstance(result, str)
-        assert len(result) > 0
+        decompressed = zlib.decompress(base64.urlsafe_b64decode(encoded))
+        assert json.loads(decompressed)["code"] == code
+        # Not \uXXXX escapes, matching orjson's output byte for byte
+        assert "日本".encode() in decompressed
 
-    def test_encode_mermaid_with_complex_diagram(self):
-        """Test encoding of complex Mermaid diagram."""
-        # Arrange
-        complex_code = """graph TB
+    @pytest.mark.parametrize(
+        "code",
+        [
+            "",
+            "flowchart TD\\n    A-->B",
+            """graph TB
     subgraph "Authentication"
         A[User] --> B{Login?}
         B -->|Yes| C[Dashboard]
@@ -67,95 +93,63 @@ class TestEncodeMermaid:
     subgraph "Dashboard"
         C --> E[View Data]
         C --> F[Settings]
-    end"""
-
+    end""",
+            """flowchart TD
+    A["Node with 'quotes'"] --> B["Node with \\"double quotes\\""]
+    B --> C{Decision with \\n newline?}""",
+        ],
+        ids=["empty", "simple", "complex", "special-characters"],
+    )
+    def test_encode_mermaid_produces_urlsafe_zlib_payload(self, code):
+        """Test that any code encodes to a URL-safe zlib stream."""
         # Act
-        result = encode_mermaid(complex_code)
+        result = encode_mermaid(code)
 
         # Assert
-        assert isinstance(result, str)
-        # Complex diagrams should produce longer encoded strings
-        assert len(result) > 50
+        assert result.startswith(ZLIB_HEADER_B64)
+        assert set(result) <= URLSAFE_B64_ALPHABET
 
 
 class TestGetMermaidUrl:
     """Tests for Mermaid URL generation."""
 
-    def test_get_mermaid_url_svg_format(self, sample_mermaid_code):
-        """Test URL generation with SVG format (default)."""
-        # Act
-        result = get_mermaid_url(sample_mermaid_code, "svg")
-
-        # Assert
-        assert result.startswith("https://mermaid.ink/svg/pako:")
-        assert "pako:" in result
-
-    def test_get_mermaid_url_png_format(self, sample_mermaid_code):
-        """Test URL generation with PNG format."""
-        # Act
-        result = get_mermaid_url(sample_mermaid_code, "png")
-
-        # Assert
-        assert result.startswith("https://mermaid.ink/img/pako:")
-        assert "type=png" in result
+    @pytest.mark.parametrize(
+        "output_format,prefix,suffix",
+        [
+            ("svg", "https://mermaid.ink/svg/pako:", ""),
+            ("png", "https://mermaid.ink/img/pako:", "?type=png"),
+            ("img", "https://mermaid.ink/img/pako:", ""),
+            (None, "https://mermaid.ink/svg/pako:", ""),
+        ],
+    )
+    def test_output_format_selects_endpoint(
+        self, sample_mermaid_code, encoded, output_format, prefix, suffix
+    ):
+        """Test that each format maps to its mermaid.ink endpoint (SVG by default)."""
+        # Arrange
+        args = [sample_mermaid_code]
+        if output_format is not None:
+            args.append(output_format)
 
-    def test_get_mermaid_url_img_format(self, sample_mermaid_code):
-        """Test URL generation with IMG format."""
         # Act
-        result = get_mermaid_url(sample_mermaid_code, "img")
+        url = get_mermaid_url(*args)
+        result = draw_mermaid_diagram(*args)
 
         # Assert
-        assert result.startswith("https://mermaid.ink/img/pako:")
-        assert "type=png" not in result
-
-    def test_get_mermaid_url_default_format(self, sample_mermaid_code):
-        """Test URL generation with default format."""
-        # Act
-        result = get_mermaid_url(sample_mermaid_code)
-
-        # Assert - should default to SVG
-        assert result.startswith("https://mermaid.ink/svg/pako:")
+        assert url == f"{prefix}{encoded}{suffix}"
+        assert result == {"url": url, "format": output_format or "svg"}
 
 
 class TestDrawMermaidDiagram:
     """Tests for the main draw_mermaid_diagram function."""
 
-    def test_draw_mermaid_diagram_returns_dict(self, sample_mermaid_code):
+    def test_draw_mermaid_diagram_returns_dict(self, expected_urls):
         """Test that draw_mermaid_diagram returns a dictionary."""
         # Act
-        result = draw_mermaid_diagram(sample_mermaid_code)
-
-        # Assert
-        assert isinstance(result, dict)
-        assert "url" in result
-        assert "format" in result
-
-    def test_draw_mermaid_diagram_svg_format(self, sample_mermaid_code):
-        """Test diagram creation with SVG format."""
-        # Act
-        result = draw_mermaid_diagram(sample_mermaid_code, "svg")
-
-        # Assert
-        assert result["format"] == "svg"
-        assert "mermaid.ink/svg/" in result["url"]
-
-    def test_draw_mermaid_diagram_png_format(self, sample_mermaid_code):
-        """Test diagram creation with PNG format."""
-        # Act
-        result = draw_mermaid_diagram(sample_mermaid_code, "png")
+        result = draw_mermaid_diagram(GOLDEN_CODE)
 
         # Assert
-        assert result["format"] == "png"
-        assert "mermaid.ink/img/" in result["url"]
-        assert "type=png" in result["url"]
-
-    def test_draw_mermaid_diagram_default_format(self, sample_mermaid_code):
-        """Test diagram creation with default format."""
-        # Act
-        result = draw_mermaid_diagram(sample_mermaid_code)
-
-        # Assert
-        assert result["format"] == "svg"
+        assert result == {"url": expected_urls["svg"], "format": "svg"}
 
     def test_draw_mermaid_diagram_strips_whitespace(self):
         """Test that the function strips leading/trailing whitespace."""
@@ -180,10 +174,7 @@ class TestDrawMermaidDiagram:
         result = draw_mermaid_diagram(sample_mermaid_code)
 
         # Assert
-        url = result["url"]
-        assert url.startswith("https://")
-        assert "mermaid.ink" in url
-        assert "pako:" in url
+        assert result["url"].startswith("https://mermaid.ink/svg/pako:")
 
     def test_draw_mermaid_diagram_with_sequence_diagram(self):
         """Test with a sequence diagram."""
@@ -215,41 +206,33 @@ class TestDrawMermaidDiagram:
 
         # Assert
         assert "url" in result
-        assert "mermaid.ink" in result["url"]
+        assert result["url"].startswith("https://mermaid.ink/svg/pako:")
 
 
 class TestMermaidEdgeCases:
     """Tests for edge cases and error handling."""
 
-    def test_encode_empty_string(self):
-        """Test encoding an empty string."""
-        # Act
-        result = encode_mermaid("")
-
-        # Assert
-        assert isinstance(result, str)
-        assert len(result) > 0
-
-    def test_encode_with_special_characters(self):
-        """Test encoding Mermaid code with special characters."""
+    @pytest.mark.parametrize("output_format", ["svg", "png", "img"])
+    def test_draw_mermaid_diagram_consistency(self, expected_urls, output_format):
+        """Test that an uncached call produces the pinned URL for each format."""
         # Arrange
-        code_with_special = """flowchart TD
-    A["Node with 'quotes'"] --> B["Node with \\"double quotes\\""]
-    B --> C{Decision with \\n newline?}"""
+        encode_mermaid.cache_clear()
+        get_mermaid_url.cache_clear()
 
         # Act
-        result = encode_mermaid(code_with_special)
+        result = draw_mermaid_diagram(GOLDEN_CODE, output_format)
 
         # Assert
-        assert isinstance(result, str)
-        # Should handle special characters without errors
+        assert result["url"] == expected_urls[output_format]
+
+    def test_repeated_encoding_is_served_from_cache(self, sample_mermaid_code):
+        """Test that encoding the same code twice reuses the cached result."""
+        # Arrange
+        encode_mermaid.cache_clear()
 
-    def test_draw_mermaid_diagram_consistency(self, sample_mermaid_code):
-        """Test that multiple calls with same input produce same output."""
         # Act
-        result1 = draw_mermaid_diagram(sample_mermaid_code)
-        result2 = draw_mermaid_diagram(sample_mermaid_code)
+        encode_mermaid(sample_mermaid_code)
+        encode_mermaid(sample_mermaid_code)
 
         # Assert
-        assert result1["url"] == result2["url"]
-        assert result1["format"] == result2["format"]
+        assert encode_mermaid.cache_info().hits == 1
@@ -1,111 +1,54 @@
 """Unit tests for GCS file upload - simplified version."""
 
 import pytest
-from unittest.mock import MagicMock, patch
-from move_file_to_gcs import move_file_to_gcs
+from unittest.mock import patch
+from google.cloud import storage
+from move_file_to_gcs import HTTP_POOL_SIZE, upload_to_gcs
 
 
 pytestmark = pytest.mark.unit
 
 
-class TestMoveFileToGCS:
-    """Tests for the move_file_to_gcs function."""
+class TestUploadToGCS:
+    """Tests for uploading in-memory data."""
 
-    def test_move_file_to_gcs_basic_flow(self, tmp_path):
-        """Test basic upload flow with temp file."""
-        # Arrange - create actual temp file
-        test_file = tmp_path / "test.png"
-        test_file.write_text("fake image data")
-        filename = str(test_file)
+    def test_upload_to_gcs_uploads_bytes_as_png(self, mock_gcs_client):
+        """Test that the data is uploaded to the named blob as a PNG."""
+        # Act
+        result = upload_to_gcs("diagram.png", b"png", "test-bucket", "test-project")
 
-        with patch("move_file_to_gcs.Client") as mock_client_class:
-            mock_client = MagicMock()
-            mock_bucket = MagicMock()
-            mock_blob = MagicMock()
+        # Assert
+        mock_gcs_client.bucket.assert_called_once_with("test-bucket")
+        mock_gcs_client.bucket.return_value.blob.assert_called_once_with("diagram.png")
+        result.upload_from_string.assert_called_once_with(
+            b"png", content_type="image/png"
+        )
 
-            mock_blob.bucket.name = "my-bucket"
-            mock_blob.name = "test.png"
-            mock_blob.upload_from_filename = MagicMock()  # Don't actually upload
-
-            mock_bucket.blob.return_value = mock_blob
-            mock_client.bucket.return_value = mock_bucket
-            mock_client_class.return_value = mock_client
-
-            # Act
-            result = move_file_to_gcs(filename, "my-bucket", "my-project")
-
-            # Assert
-            assert result == mock_blob
-            mock_client_class.assert_called_once_with(project="my-project")
-            mock_client.bucket.assert_called_once_with("my-bucket")
-            mock_blob.upload_from_filename.assert_called_once_with(filename)
-
-    def test_move_file_to_gcs_uses_env_var_project_id(self, tmp_path):
+    def test_upload_to_gcs_uses_env_var_project_id(self, mock_gcs_client):
         """Test that it uses environment variable when project_id is None."""
         # Arrange
-        test_file = tmp_path / "test.png"
-        test_file.write_text("data")
-        filename = str(test_file)
-
-        with (
-            patch("move_file_to_gcs.Client") as mock_client_class,
-            patch("move_file_to_gcs.GCP_PROJECT_ID", "env-project"),
-        ):
-            mock_client = MagicMock()
-            mock_bucket = MagicMock()
-            mock_blob = MagicMock()
-            mock_blob.upload_from_filename = MagicMock()
-
-            mock_bucket.blob.return_value = mock_blob
-            mock_client.bucket.return_value = mock_bucket
-            mock_client_class.return_value = mock_client
-
+        with patch("move_file_to_gcs.GCP_PROJECT_ID", "env-project"):
             # Act
-            move_file_to_gcs(filename, "bucket", project_id=None)
+            upload_to_gcs("diagram.png", b"png", "bucket", project_id=None)
 
-            # Assert
-            mock_client_class.assert_called_once_with(project="env-project")
-
-    def test_move_file_to_gcs_removes_file_after_upload(self, tmp_path):
-        """Test that local file is removed after successful upload."""
-        # Arrange
-        test_file = tmp_path / "to_remove.png"
-        test_file.write_text("data")
-        filename = str(test_file)
+        # Assert
+        storage.Client.assert_called_once_with(project="env-project")
 
-        with patch("move_file_to_gcs.Client") as mock_client_class:
-            mock_client = MagicMock()
-            mock_bucket = MagicMock()
-            mock_blob = MagicMock()
-            mock_blob.upload_from_filename = MagicMock()
+    def test_upload_to_gcs_reuses_client_per_project(self, mock_gcs_client):
+        """Test that the storage client is built once per project."""
+        # Act
+        for _ in range(2):
+            upload_to_gcs("diagram.png", b"png", "bucket", "project")
 
-            mock_bucket.blob.return_value = mock_blob
-            mock_client.bucket.return_value = mock_bucket
-            mock_client_class.return_value = mock_client
+        # Assert
+        storage.Client.assert_called_once_with(project="project")
 
-            # Verify file exists
-            assert test_file.exists()
-
-            # Act
-            move_file_to_gcs(filename, "bucket", "project")
-
-            # Assert - file should be removed
-            assert not test_file.exists()
-
-
-class TestMoveFileToGCSMocked:
-    """Tests using the mock_gcs_client fixture."""
-
-    def test_with_fixture(self, mock_gcs_client, tmp_path):
-        """Test using the shared GCS fixture."""
-        # Arrange
-        test_file = tmp_path / "fixture_test.png"
-        test_file.write_text("data")
-
-        with patch("os.remove"):
-            # Act
-            result = move_file_to_gcs(str(test_file), "test-bucket", "test-project")
+    def test_client_connection_pool_fits_concurrent_uploads(self, mock_gcs_client):
+        """Test that the client's HTTP session keeps HTTP_POOL_SIZE connections."""
+        # Act
+        upload_to_gcs("diagram.png", b"png", "bucket", "project")
 
-            # Assert
-            assert result is not None
-            assert result.bucket.name == "test-bucket"
+        # Assert
+        prefix, adapter = mock_gcs_client._http.mount.call_args.args
+        assert prefix == "https://"
+        assert adapter._pool_maxsize == HTTP_POOL_SIZE